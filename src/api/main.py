@@ -4,13 +4,16 @@ DataGenie AI - FastAPI Application
 Main API entry point with all endpoints.
 """
 
+import asyncio
+import json
 import logging
+from dataclasses import asdict
 from typing import Optional, List, Dict, Any
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from ..config import settings
@@ -95,6 +98,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down DataGenie AI...")
+    if "llm_router" in services:
+        services["llm_router"].close()
     services.clear()
 
 
@@ -186,7 +191,7 @@ async def process_query(
     try:
         logger.info(f"Processing query: {request.query[:50]}...")
 
-        result = sql_generator.generate(
+        result = await sql_generator.agenerate(
             query=request.query,
             database=request.database,
             use_rag=request.use_rag,
@@ -211,26 +216,60 @@ async def process_query(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/query/stream", tags=["Query"])
+async def stream_query(
+    request: QueryRequest,
+    sql_generator: TextToSQLGenerator = Depends(get_sql_generator)
+):
+    """
+    Process a query and stream the generated SQL as Server-Sent Events.
+
+    Each event is a JSON object on a `data:` line:
+    - `{"type": "delta", "text": ...}` for every generated chunk
+    - `{"type": "result", "result": {...}}` once, with the full result and cost
+    - `{"type": "error", "detail": ...}` if generation fails
+    """
+    logger.info(f"Streaming query: {request.query[:50]}...")
+
+    async def events():
+        try:
+            async for event in sql_generator.astream(
+                query=request.query,
+                database=request.database,
+                use_rag=request.use_rag,
+                validate=request.validate_sql
+            ):
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Query streaming failed: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'detail': str(e)})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.post("/query/batch", tags=["Query"])
 async def process_batch_queries(
     queries: List[str],
     database: str = "default",
     sql_generator: TextToSQLGenerator = Depends(get_sql_generator)
 ):
-    """Process multiple queries in batch."""
-    results = []
-    
-    for query in queries:
-        try:
-            result = sql_generator.generate_dict(
-                query=query,
-                database=database
-            )
-            results.append({"query": query, "result": result, "error": None})
-        except Exception as e:
-            results.append({"query": query, "result": None, "error": str(e)})
+    """Process multiple queries in batch (concurrently, bounded)."""
+    semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
+
+    async def run_one(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await sql_generator.agenerate(
+                    query=query,
+                    database=database
+                )
+                return {"query": query, "result": asdict(result), "error": None}
+            except Exception as e:
+                return {"query": query, "result": None, "error": str(e)}
+
+    results = await asyncio.gather(*(run_one(query) for query in queries))
 
-    return {"results": results, "total": len(queries)}
+    return {"results": list(results), "total": len(queries)}
 
 
 @app.get("/examples", response_model=ExampleResponse, tags=["General"])
@@ -331,7 +370,7 @@ async def test_llm(prompt: str = "Hello, how are you?"):
         raise HTTPException(status_code=503, detail="LLM router not initialized")
     
     try:
-        response = llm_router.route_query(
+        response = await llm_router.aroute_query(
             prompt=prompt,
             task_type="simple_sql",
             max_tokens=100
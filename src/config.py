@@ -57,6 +57,116 @@ class Settings(BaseSettings):
         default="claude-sonnet-4-20250514",
         description="Claude model to use"
     )
+    claude_use_bedrock: bool = Field(
+        default=False,
+        description="Call Claude through Amazon Bedrock instead of the Anthropic API"
+    )
+    aws_region: Optional[str] = Field(
+        default=None,
+        description="AWS region for Bedrock (default from the AWS environment)"
+    )
+    claude_latency_optimized: bool = Field(
+        default=False,
+        description="Request Bedrock latency-optimized inference for Claude"
+    )
+    claude_prompt_caching: bool = Field(
+        default=True,
+        description="Mark system prompts as Anthropic prompt-cache breakpoints"
+    )
+
+    # LLM Response Cache
+    llm_cache_enabled: bool = Field(
+        default=True,
+        description="Cache identical deterministic LLM requests"
+    )
+    llm_cache_max_size: int = Field(
+        default=512,
+        description="Maximum entries in the in-process response cache"
+    )
+    llm_cache_ttl: int = Field(
+        default=86400,
+        description="Response cache TTL in seconds (Redis backend)"
+    )
+    redis_url: Optional[str] = Field(
+        default=None,
+        description="Optional Redis URL for a shared response cache"
+    )
+    semantic_cache_enabled: bool = Field(
+        default=True,
+        description="Serve paraphrased cloud prompts from the semantic cache"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.92,
+        description="Minimum cosine similarity for a semantic cache hit"
+    )
+    semantic_cache_dir: str = Field(
+        default="./data/semantic_cache",
+        description="Semantic cache persistence directory"
+    )
+    semantic_cache_max_entries: int = Field(
+        default=10000,
+        description="Maximum semantic cache entries (oldest evicted first)"
+    )
+    semantic_cache_flush_interval: float = Field(
+        default=30.0,
+        description="Seconds between background semantic cache flushes to disk"
+    )
+
+    # Bulk / offline requests
+    allow_batch_api: bool = Field(
+        default=False,
+        description="Send bulk cloud requests through the Message Batches API"
+    )
+    batch_api_min_size: int = Field(
+        default=10,
+        description="Minimum cloud requests before using the Batches API"
+    )
+    batch_poll_interval: float = Field(
+        default=5.0,
+        description="Seconds between Batches API status checks"
+    )
+    batch_api_timeout: float = Field(
+        default=86400.0,
+        description="Maximum seconds to wait for a Claude batch"
+    )
+    ollama_max_concurrency: int = Field(
+        default=2,
+        description="Maximum concurrent Ollama requests in bulk routing"
+    )
+
+    # Background Ollama availability probe
+    health_probe_interval: float = Field(
+        default=10.0,
+        description="Seconds between background Ollama availability probes"
+    )
+
+    # Provider circuit breakers
+    circuit_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive provider failures before its circuit opens"
+    )
+    circuit_recovery_timeout: float = Field(
+        default=30.0,
+        description="Seconds a circuit stays open before a probe request"
+    )
+
+    # Request timeouts (local CPU models can legitimately need >1800s)
+    claude_request_timeout: float = Field(
+        default=60.0,
+        description="Claude request timeout in seconds"
+    )
+    ollama_request_timeout: float = Field(
+        default=120.0,
+        description="Ollama request timeout in seconds"
+    )
+    hedge_latency_multiplier: float = Field(
+        default=3.0,
+        description="Fall back early when a call exceeds p50 latency x this (0 disables)"
+    )
+    hedge_min_samples: int = Field(
+        default=20,
+        description="Latency samples required before early fallback kicks in"
+    )
 
     # -------------------------------------------------------------------------
     # Vector Database (ChromaDB)
@@ -159,6 +269,11 @@ class Settings(BaseSettings):
         """Check if Anthropic API key is configured."""
         return bool(self.anthropic_api_key)
 
+    @property
+    def has_claude_config(self) -> bool:
+        """Check if Claude is reachable via API key or Bedrock."""
+        return self.has_anthropic_key or self.claude_use_bedrock
+
     @property
     def has_powerbi_config(self) -> bool:
         """Check if Power BI is configured."""
@@ -9,6 +9,10 @@ Provides hybrid LLM support with intelligent routing between:
 from .ollama_service import OllamaService
 from .claude_service import ClaudeService
 from .router import LLMRouter, TaskType, get_llm_router
+from .cache import ResponseCache
+from .semantic_cache import SemanticCache
+from .batch import ClaudeBatchClient
+from .circuit import CircuitBreaker, CircuitOpenError
 
 __all__ = [
     "OllamaService",
@@ -16,4 +20,9 @@ __all__ = [
     "LLMRouter",
     "TaskType",
     "get_llm_router",
+    "ResponseCache",
+    "SemanticCache",
+    "ClaudeBatchClient",
+    "CircuitBreaker",
+    "CircuitOpenError",
 ]
@@ -0,0 +1,127 @@
+"""
+DataGenie AI - Claude Batch Client
+
+Submits bulk offline requests through Anthropic's Message Batches API,
+which is billed at 50% of the standard price.
+"""
+
+import logging
+import time
+from typing import Dict, Any, Optional, List
+
+from .claude_service import ClaudeService
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Message Batches pricing relative to the synchronous API
+BATCH_DISCOUNT = 0.5
+
+
+class ClaudeBatchClient:
+    """
+    Message Batches client for bulk Claude inference.
+
+    Features:
+    - Single submission for many prompts
+    - Polling until the batch has ended
+    - Per-item cost at batch pricing
+    """
+
+    def __init__(
+        self,
+        claude: ClaudeService,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize batch client.
+
+        Args:
+            claude: Initialized Claude service (client and pricing are reused)
+            poll_interval: Seconds between status checks (default from settings)
+            timeout: Maximum seconds to wait for completion (default from settings)
+        """
+        if not claude._client:
+            raise RuntimeError("Claude client not initialized. Check API key.")
+
+        self._claude = claude
+        self.poll_interval = poll_interval or settings.batch_poll_interval
+        self.timeout = timeout or settings.batch_api_timeout
+
+        messages = claude._client.messages
+        # Older SDKs only expose batches under the beta namespace
+        self._batches = getattr(messages, "batches", None)
+        if self._batches is None:
+            self._batches = claude._client.beta.messages.batches
+
+    def run(self, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Submit requests as one batch and wait for the results.
+
+        Args:
+            requests: Dicts with 'custom_id', 'prompt' and optional
+                'system_prompt', 'max_tokens', 'temperature'
+
+        Returns:
+            Dict mapping custom_id to a result dict; failed items carry 'error'
+        """
+        # All entries use one model; keep identical system prompts adjacent
+        # so the server sees shared prefixes back to back
+        ordered = sorted(requests, key=lambda r: r.get("system_prompt") or "")
+
+        batch = self._batches.create(
+            requests=[self._build_request(r) for r in ordered]
+        )
+        logger.info(f"Submitted Claude batch {batch.id} with {len(ordered)} requests")
+
+        self._wait(batch.id)
+        return self._collect(batch.id)
+
+    def _build_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a router request into a batch entry."""
+        params = self._claude._build_request_params(
+            request["prompt"],
+            request.get("system_prompt"),
+            request.get("max_tokens", 1000),
+            request.get("temperature", 0.7),
+        )
+        return {"custom_id": request["custom_id"], "params": params}
+
+    def _wait(self, batch_id: str):
+        """Poll until the batch has ended or the timeout expires."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            batch = self._batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                logger.info(f"Claude batch {batch_id} ended")
+                return
+            if time.monotonic() >= deadline:
+                # Callers resend the items individually, so stop the batch
+                # from finishing (and being billed) in the background
+                try:
+                    self._batches.cancel(batch_id)
+                    logger.warning(f"Cancelled Claude batch {batch_id} after timeout")
+                except Exception as e:
+                    logger.error(f"Failed to cancel Claude batch {batch_id}: {e}")
+                raise TimeoutError(f"Claude batch {batch_id} did not finish in time")
+            time.sleep(self.poll_interval)
+
+    def _collect(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Read batch results into router-style result dicts."""
+        results = {}
+        for entry in self._batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                error = getattr(entry.result, "error", None)
+                results[entry.custom_id] = {
+                    "error": str(error) if error else entry.result.type,
+                    "provider": "claude",
+                }
+                continue
+
+            result = self._claude._build_result(entry.result.message)
+            result["cost"] *= BATCH_DISCOUNT
+            result["batch"] = True
+            results[entry.custom_id] = result
+
+        return results
@@ -0,0 +1,168 @@
+"""
+DataGenie AI - LLM Response Cache
+
+Exact-match response cache for routed LLM calls.
+Keeps an in-process LRU and optionally mirrors entries to Redis.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    Build a stable cache key from request parameters.
+
+    Args:
+        **parts: Request fields (prompt, system_prompt, model, ...)
+
+    Returns:
+        str: SHA256 hex digest of the canonical JSON encoding
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match LLM response cache.
+
+    Features:
+    - Bounded in-process LRU
+    - Optional Redis backend shared across workers
+    - Hit/miss statistics
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            max_size: Maximum in-process entries (default from settings)
+            redis_url: Redis URL for shared cache (default from settings)
+            ttl: Redis entry time-to-live in seconds (default from settings)
+        """
+        self.max_size = max_size or settings.llm_cache_max_size
+        self.ttl = ttl or settings.llm_cache_ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+
+        redis_url = redis_url or settings.redis_url
+        if redis_url:
+            self._initialize_redis(redis_url)
+
+    def _initialize_redis(self, redis_url: str):
+        """Connect to Redis, falling back to in-process only on failure."""
+        try:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+            self._redis.ping()
+            logger.info("LLM response cache backed by Redis")
+        except ImportError:
+            logger.warning("redis package not installed, using in-process cache only")
+            self._redis = None
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-process cache only: {e}")
+            self._redis = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Cached response dict or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry)
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(f"datagenie:llm:{key}")
+                if raw:
+                    entry = json.loads(raw)
+                    with self._lock:
+                        self._store_local(key, entry)
+                        self.hits += 1
+                    return dict(entry)
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """
+        Store a response.
+
+        Args:
+            key: Cache key from make_cache_key
+            value: Response dict (cost is stripped before storing)
+        """
+        entry = {k: v for k, v in value.items() if k != "cost"}
+
+        with self._lock:
+            self._store_local(key, entry)
+
+        if self._redis is not None:
+            try:
+                self._redis.set(
+                    f"datagenie:llm:{key}",
+                    json.dumps(entry, default=str),
+                    ex=self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+
+    def _store_local(self, key: str, entry: Dict[str, Any]):
+        """Insert into the LRU, evicting the oldest entry when full."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Clear in-process entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hits, misses, size and backend
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "backend": "redis" if self._redis is not None else "memory",
+            }
@@ -0,0 +1,137 @@
+"""
+DataGenie AI - Circuit Breaker
+
+Closed/open/half-open circuit breaker for LLM providers, so a failing
+provider is skipped immediately instead of timing out on every request.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider is skipped because its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Provider circuit breaker.
+
+    States:
+    - closed: calls pass through, consecutive failures are counted
+    - open: calls are rejected until the recovery timeout elapses
+    - half_open: a single probe call decides whether to close again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Provider name used in logs
+            failure_threshold: Consecutive failures before opening (default from settings)
+            recovery_timeout: Seconds to stay open before probing (default from settings)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self.recovery_timeout = recovery_timeout or settings.circuit_recovery_timeout
+
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be attempted.
+
+        Returns:
+            bool: True if closed, or if this call is the half-open probe
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                logger.info(f"{self.name} circuit half-open, probing")
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                # A probe that never reported back (e.g. lost without a
+                # release) must not block the provider forever
+                if time.monotonic() - self._probe_started < self.recovery_timeout:
+                    return False
+                logger.warning(f"{self.name} circuit probe stale, probing again")
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+
+    def record_success(self):
+        """Record a successful call and close the circuit."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit when the threshold is hit."""
+        with self._lock:
+            self.failure_count += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"{self.name} circuit open after {self.failure_count} failures"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give up a half-open probe without recording an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def trip(self):
+        """Open the circuit immediately (e.g. after a hard timeout)."""
+        with self._lock:
+            if self.state != self.OPEN:
+                logger.warning(f"{self.name} circuit tripped open")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state.
+
+        Returns:
+            Dict with state and consecutive failure count
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+            }
@@ -6,7 +6,7 @@ Used for complex queries requiring higher reasoning capability.
 """
 
 import logging
-from typing import Dict, Any, Optional, List, Generator
+from typing import Dict, Any, Optional, List, Generator, AsyncGenerator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..config import settings
@@ -28,7 +28,8 @@ class ClaudeService:
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        timeout: Optional[float] = None
     ):
         """
         Initialize Claude service.
@@ -37,21 +38,49 @@ class ClaudeService:
             api_key: Anthropic API key (default from settings)
             model: Claude model name (default from settings)
             max_retries: Maximum retry attempts
+            timeout: Request timeout in seconds (default from settings)
         """
         self.api_key = api_key or settings.anthropic_api_key
         self.model = model or settings.anthropic_model
         self.max_retries = max_retries
+        self.timeout = timeout or settings.claude_request_timeout
+        self.use_bedrock = settings.claude_use_bedrock
         self._client = None
+        self._async_client = None
+        self._extra_headers: Dict[str, str] = {}
 
-        if self.api_key:
+        if self.api_key or self.use_bedrock:
             self._initialize_client()
 
     def _initialize_client(self):
-        """Initialize the Anthropic client."""
+        """Initialize the Anthropic (or Bedrock-hosted Anthropic) client."""
         try:
             import anthropic
-            self._client = anthropic.Anthropic(api_key=self.api_key)
-            logger.info(f"Claude client initialized with model: {self.model}")
+            if self.use_bedrock:
+                # AWS credentials come from the standard boto3 chain
+                self._client = anthropic.AnthropicBedrock(
+                    aws_region=settings.aws_region, timeout=self.timeout
+                )
+                self._async_client = anthropic.AsyncAnthropicBedrock(
+                    aws_region=settings.aws_region, timeout=self.timeout
+                )
+                if settings.claude_latency_optimized:
+                    # Bedrock's performanceConfig latency=optimized
+                    self._extra_headers[
+                        "X-Amzn-Bedrock-PerformanceConfig-Latency"
+                    ] = "optimized"
+            else:
+                self._client = anthropic.Anthropic(
+                    api_key=self.api_key, timeout=self.timeout
+                )
+                # Shared async client so concurrent calls reuse one connection pool
+                self._async_client = anthropic.AsyncAnthropic(
+                    api_key=self.api_key, timeout=self.timeout
+                )
+            logger.info(
+                f"Claude client initialized with model: {self.model} "
+                f"(latency={self.latency_mode})"
+            )
         except ImportError:
             logger.error("anthropic package not installed. Run: pip install anthropic")
             raise
@@ -59,6 +88,11 @@ class ClaudeService:
             logger.error(f"Failed to initialize Claude client: {e}")
             raise
 
+    @property
+    def latency_mode(self) -> str:
+        """Inference latency mode: 'optimized' (Bedrock only) or 'standard'."""
+        return "optimized" if self._extra_headers else "standard"
+
     def is_available(self) -> bool:
         """
         Check if Claude service is available.
@@ -109,47 +143,20 @@ class ClaudeService:
         if not self._client:
             raise RuntimeError("Claude client not initialized. Check API key.")
 
-        messages = [{"role": "user", "content": prompt}]
-        
-        request_params = {
-            "model": self.model,
-            "max_tokens": max_tokens,
-            "messages": messages,
-            "temperature": temperature,
-        }
-
-        if system_prompt:
-            request_params["system"] = system_prompt
+        request_params = self._build_request_params(
+            prompt, system_prompt, max_tokens, temperature
+        )
 
         logger.debug(f"Claude request: model={self.model}, prompt_len={len(prompt)}")
 
         try:
-            response = self._client.messages.create(**request_params)
-
-            # Extract content from response
-            content = ""
-            for block in response.content:
-                if hasattr(block, "text"):
-                    content += block.text
-
-            # Calculate cost (approximate)
-            input_tokens = response.usage.input_tokens
-            output_tokens = response.usage.output_tokens
-            cost = self._calculate_cost(input_tokens, output_tokens)
-
-            result = {
-                "content": content,
-                "model": response.model,
-                "tokens": input_tokens + output_tokens,
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-                "cost": cost,
-                "stop_reason": response.stop_reason,
-                "provider": "claude"
-            }
+            response = self._client.messages.create(
+                **request_params, extra_headers=self._extra_headers
+            )
+            result = self._build_result(response)
 
             logger.info(
-                f"Claude response: tokens={result['tokens']}, cost=${cost:.4f}"
+                f"Claude response: tokens={result['tokens']}, cost=${result['cost']:.4f}"
             )
             return result
 
@@ -180,15 +187,12 @@ class ClaudeService:
         if not self._client:
             raise RuntimeError("Claude client not initialized")
 
-        messages = [{"role": "user", "content": prompt}]
-
         try:
             with self._client.messages.stream(
-                model=self.model,
-                max_tokens=max_tokens,
-                messages=messages,
-                system=system_prompt or "",
-                temperature=temperature
+                **self._build_request_params(
+                    prompt, system_prompt, max_tokens, temperature
+                ),
+                extra_headers=self._extra_headers
             ) as stream:
                 for text in stream.text_stream:
                     yield text
@@ -196,6 +200,10 @@ class ClaudeService:
             logger.error(f"Claude streaming error: {e}")
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10)
+    )
     async def generate_async(
         self,
         prompt: str,
@@ -214,46 +222,63 @@ class ClaudeService:
             temperature: Sampling temperature
             
         Returns:
-            Dict with generation results
+            Dict with 'content', 'model', 'tokens', 'cost'
         """
-        if not self.api_key:
-            raise RuntimeError("Claude API key not configured")
-
-        import anthropic
-        async_client = anthropic.AsyncAnthropic(api_key=self.api_key)
+        if not self._async_client:
+            raise RuntimeError("Claude client not initialized. Check API key.")
 
-        messages = [{"role": "user", "content": prompt}]
+        request_params = self._build_request_params(
+            prompt, system_prompt, max_tokens, temperature
+        )
 
         try:
-            response = await async_client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                messages=messages,
-                system=system_prompt or "",
-                temperature=temperature
+            response = await self._async_client.messages.create(
+                **request_params, extra_headers=self._extra_headers
             )
+            return self._build_result(response)
+        except Exception as e:
+            logger.error(f"Claude async error: {e}")
+            raise
 
-            content = ""
-            for block in response.content:
-                if hasattr(block, "text"):
-                    content += block.text
-
-            input_tokens = response.usage.input_tokens
-            output_tokens = response.usage.output_tokens
-            cost = self._calculate_cost(input_tokens, output_tokens)
+    async def generate_stream_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Async streaming generation.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            max_tokens: Maximum tokens
+            temperature: Sampling temperature
+            
+        Yields:
+            {'type': 'delta', 'text': ...} events, then one
+            {'type': 'result', 'result': {...}} event with usage and cost
+        """
+        if not self._async_client:
+            raise RuntimeError("Claude client not initialized. Check API key.")
 
-            return {
-                "content": content,
-                "model": response.model,
-                "tokens": input_tokens + output_tokens,
-                "cost": cost,
-                "provider": "claude"
-            }
+        try:
+            async with self._async_client.messages.stream(
+                **self._build_request_params(
+                    prompt, system_prompt, max_tokens, temperature
+                ),
+                extra_headers=self._extra_headers
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield {"type": "delta", "text": text}
+                message = await stream.get_final_message()
         except Exception as e:
-            logger.error(f"Claude async error: {e}")
+            logger.error(f"Claude async streaming error: {e}")
             raise
-        finally:
-            await async_client.close()
+
+        yield {"type": "result", "result": self._build_result(message)}
 
     def chat(
         self,
@@ -306,7 +331,84 @@ class ClaudeService:
             logger.error(f"Claude chat error: {e}")
             raise
 
-    def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
+    def _system_blocks(self, system_prompt: str) -> Any:
+        """
+        Format the system prompt, marking it as a prompt-cache breakpoint.
+
+        Identical system prompts (instructions + schema) are then billed at
+        the cache-read rate on subsequent requests.
+        """
+        if not settings.claude_prompt_caching:
+            return system_prompt
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"},
+        }]
+
+    def _build_request_params(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float
+    ) -> Dict[str, Any]:
+        """Build Messages API parameters for a single-turn request."""
+        request_params = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+        }
+
+        if system_prompt:
+            request_params["system"] = self._system_blocks(system_prompt)
+
+        return request_params
+
+    def _build_result(self, response) -> Dict[str, Any]:
+        """
+        Convert a Messages API response into a result dict.
+
+        Args:
+            response: anthropic Message
+
+        Returns:
+            Dict with 'content', 'model', 'tokens', 'cost' and usage details
+        """
+        content = ""
+        for block in response.content:
+            if hasattr(block, "text"):
+                content += block.text
+
+        usage = response.usage
+        input_tokens = usage.input_tokens
+        output_tokens = usage.output_tokens
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+
+        return {
+            "content": content,
+            "model": response.model,
+            "tokens": input_tokens + cache_read + cache_write + output_tokens,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_write,
+            "cost": self._calculate_cost(
+                input_tokens, output_tokens, cache_read, cache_write
+            ),
+            "stop_reason": response.stop_reason,
+            "provider": "claude"
+        }
+
+    def _calculate_cost(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
         """
         Calculate approximate cost for Claude API usage.
         
@@ -314,10 +416,13 @@ class ClaudeService:
         - Claude Sonnet: $3/1M input, $15/1M output
         - Claude Opus: $15/1M input, $75/1M output
         - Claude Haiku: $0.25/1M input, $1.25/1M output
+        - Prompt cache: reads at 10% of input price, writes at 125%
         
         Args:
-            input_tokens: Number of input tokens
+            input_tokens: Number of uncached input tokens
             output_tokens: Number of output tokens
+            cache_read_tokens: Input tokens served from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
             
         Returns:
             float: Estimated cost in USD
@@ -333,7 +438,12 @@ class ClaudeService:
             input_cost = 3.0 / 1_000_000
             output_cost = 15.0 / 1_000_000
 
-        return (input_tokens * input_cost) + (output_tokens * output_cost)
+        return (
+            (input_tokens * input_cost)
+            + (cache_read_tokens * input_cost * 0.1)
+            + (cache_write_tokens * input_cost * 1.25)
+            + (output_tokens * output_cost)
+        )
 
     def count_tokens(self, text: str) -> int:
         """
@@ -5,8 +5,9 @@ Local LLM service using Ollama for fast, cost-free inference.
 Optimized for 8GB RAM systems.
 """
 
+import json
 import logging
-from typing import Dict, Any, Optional, Generator
+from typing import Dict, Any, Optional, Generator, AsyncGenerator
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -29,7 +30,7 @@ class OllamaService:
         self,
         base_url: Optional[str] = None,
         model: Optional[str] = None,
-        timeout: float = 120.0
+        timeout: Optional[float] = None
     ):
         """
         Initialize Ollama service.
@@ -37,11 +38,12 @@ class OllamaService:
         Args:
             base_url: Ollama API URL (default from settings)
             model: Model name (default from settings)
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (default from settings)
         """
         self.base_url = base_url or settings.ollama_base_url
         self.model = model or settings.ollama_model
-        self.timeout = timeout
+        self.timeout = timeout or settings.ollama_request_timeout
+        timeout = httpx.Timeout(self.timeout, connect=5.0)
         self._client = httpx.Client(timeout=timeout)
         self._async_client = httpx.AsyncClient(timeout=timeout)
 
@@ -202,7 +204,6 @@ class OllamaService:
             ) as response:
                 for line in response.iter_lines():
                     if line:
-                        import json
                         data = json.loads(line)
                         if "response" in data:
                             yield data["response"]
@@ -212,6 +213,10 @@ class OllamaService:
             logger.error(f"Ollama streaming error: {e}")
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10)
+    )
     async def generate_async(
         self,
         prompt: str,
@@ -228,9 +233,10 @@ class OllamaService:
             system_prompt: System instructions
             max_tokens: Maximum tokens
             temperature: Sampling temperature
+            **kwargs: Additional Ollama parameters
             
         Returns:
-            Dict with generation results
+            Dict with 'content', 'model', 'tokens', 'done'
         """
         payload = {
             "model": self.model,
@@ -241,6 +247,7 @@ class OllamaService:
                 "temperature": temperature,
                 "num_ctx": settings.ollama_num_ctx,
                 "num_gpu": settings.ollama_num_gpu,
+                **kwargs.get("options", {})
             }
         }
 
@@ -260,12 +267,86 @@ class OllamaService:
                 "model": data.get("model", self.model),
                 "tokens": data.get("eval_count", 0),
                 "done": data.get("done", True),
+                "total_duration": data.get("total_duration", 0),
                 "provider": "ollama"
             }
         except Exception as e:
             logger.error(f"Ollama async error: {e}")
             raise
 
+    async def generate_stream_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Async streaming generation.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            max_tokens: Maximum tokens
+            temperature: Sampling temperature
+            **kwargs: Additional Ollama parameters
+            
+        Yields:
+            {'type': 'delta', 'text': ...} events, then one
+            {'type': 'result', 'result': {...}} event with final metrics
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": temperature,
+                "num_ctx": settings.ollama_num_ctx,
+                "num_gpu": settings.ollama_num_gpu,
+                **kwargs.get("options", {})
+            }
+        }
+
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        parts = []
+        final: Dict[str, Any] = {}
+        try:
+            async with self._async_client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("response"):
+                        parts.append(data["response"])
+                        yield {"type": "delta", "text": data["response"]}
+                    if data.get("done", False):
+                        final = data
+                        break
+        except Exception as e:
+            logger.error(f"Ollama async streaming error: {e}")
+            raise
+
+        yield {
+            "type": "result",
+            "result": {
+                "content": "".join(parts),
+                "model": final.get("model", self.model),
+                "tokens": final.get("eval_count", 0),
+                "done": final.get("done", True),
+                "total_duration": final.get("total_duration", 0),
+                "provider": "ollama"
+            }
+        }
+
     def chat(
         self,
         messages: list,
@@ -5,17 +5,140 @@ Smart routing between local (Ollama) and cloud (Claude) LLMs
 based on query complexity, resource availability, and cost.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import (
+    Dict, Any, Optional, List, Tuple, Deque, FrozenSet, Callable, Awaitable,
+    AsyncGenerator
+)
 from enum import Enum
 
 from .ollama_service import OllamaService
 from .claude_service import ClaudeService
+from .cache import ResponseCache, make_cache_key
+from .semantic_cache import SemanticCache
+from .batch import ClaudeBatchClient
+from .circuit import CircuitBreaker, CircuitOpenError
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# -----------------------------------------------------------------------------
+# Query complexity indicators
+# -----------------------------------------------------------------------------
+
+_COMPLEX_INDICATORS = frozenset({
+    "join", "subquery", "having", "window function", "partition",
+    "case when", "union", "intersect", "complex", "nested",
+    "multiple tables", "across", "compare", "trend", "forecast"
+})
+
+_MEDIUM_INDICATORS = frozenset({
+    "group by", "order by", "filter", "aggregate", "sum", "count",
+    "average", "total", "by region", "by month", "top", "bottom"
+})
+
+
+_WORD_RE = re.compile(r"\w+")
+
+# Indicators split by shape: single words are looked up per token,
+# phrases (all two words) per adjacent token pair
+_INDICATOR_WORDS = tuple(
+    (cls, word)
+    for cls, words in (("complex", _COMPLEX_INDICATORS), ("medium", _MEDIUM_INDICATORS))
+    for word in sorted(words)
+    if " " not in word
+)
+_INDICATOR_PHRASES = tuple(
+    (cls, word)
+    for cls, words in (("complex", _COMPLEX_INDICATORS), ("medium", _MEDIUM_INDICATORS))
+    for word in sorted(words)
+    if " " in word
+)
+
+
+@lru_cache(maxsize=4096)
+def _token_indicators(token: str) -> FrozenSet[Tuple[str, str]]:
+    """
+    Indicators contained in a token (or a space-joined token pair).
+
+    Substring containment keeps the original `in` semantics
+    ("summary" still matches "sum"); memoizing makes repeat tokens
+    a single dict lookup.
+    """
+    candidates = _INDICATOR_PHRASES if " " in token else _INDICATOR_WORDS
+    return frozenset(item for item in candidates if item[1] in token)
+
+
+def _build_indicator_automaton():
+    """Build one Aho-Corasick automaton over all indicators (None if unavailable)."""
+    try:
+        import ahocorasick
+    except ImportError:
+        logger.debug("pyahocorasick not installed, using regex scan")
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for word in _COMPLEX_INDICATORS:
+        automaton.add_word(word, ("complex", word))
+    for word in _MEDIUM_INDICATORS:
+        automaton.add_word(word, ("medium", word))
+    automaton.make_automaton()
+    return automaton
+
+
+_INDICATOR_AUTOMATON = _build_indicator_automaton()
+
+
+def _count_indicators(query_lower: str) -> Tuple[int, int]:
+    """
+    Count distinct complex and medium indicators in a lowercased query.
+
+    Returns:
+        Tuple of (complex_count, medium_count)
+    """
+    if _INDICATOR_AUTOMATON is not None:
+        # Single linear pass over the raw string
+        found = {match for _, match in _INDICATOR_AUTOMATON.iter(query_lower)}
+    else:
+        # Tokenize once, then memoized lookups per token and token pair.
+        # Phrases match across any non-word separator, not just one space.
+        tokens = _WORD_RE.findall(query_lower)
+        found = set()
+        for token in tokens:
+            found |= _token_indicators(token)
+        for pair in map(" ".join, zip(tokens, tokens[1:])):
+            found |= _token_indicators(pair)
+
+    # Each indicator counts once however often it occurs
+    complex_count = sum(1 for cls, _ in found if cls == "complex")
+    return complex_count, len(found) - complex_count
+
+
+# Claude Sonnet pricing per token, used for cost estimates
+_INPUT_RATE = 3.0 / 1_000_000
+_OUTPUT_RATE = 15.0 / 1_000_000
+
+
+@lru_cache(maxsize=1024)
+def _estimate_claude_cost(estimated_tokens: int) -> float:
+    """
+    Estimate Claude cost for a token budget (memoized, pure).
+
+    Assumes a ~40% input / 60% output split.
+    """
+    input_tokens = int(estimated_tokens * 0.4)
+    output_tokens = int(estimated_tokens * 0.6)
+    return round(input_tokens * _INPUT_RATE + output_tokens * _OUTPUT_RATE, 6)
+
+
 class TaskType(str, Enum):
     """Task types for routing decisions."""
     SIMPLE_SQL = "simple_sql"
@@ -39,55 +162,146 @@ class LLMRouter:
     """
 
     # Routing configuration
-    LOCAL_TASKS = {
+    LOCAL_TASKS = frozenset({
         TaskType.SIMPLE_SQL,
         TaskType.INTENT_CLASSIFICATION,
         TaskType.ENTITY_EXTRACTION,
         TaskType.VALIDATION,
-    }
+    })
 
-    CLOUD_TASKS = {
+    CLOUD_TASKS = frozenset({
         TaskType.COMPLEX_SQL,
         TaskType.RAG_SYNTHESIS,
         TaskType.EXECUTIVE_SUMMARY,
         TaskType.EXPLANATION,
-    }
+    })
+
+    # Cloud tasks whose free-text answers may be reused for paraphrases
+    # (SQL is never semantically cached)
+    SEMANTIC_CACHE_TASKS = CLOUD_TASKS - {TaskType.COMPLEX_SQL}
+
+    # User-facing tasks that may race both providers when requested
+    SPECULATIVE_TASKS = frozenset({
+        TaskType.EXPLANATION,
+        TaskType.EXECUTIVE_SUMMARY,
+    })
 
     def __init__(self):
         """Initialize LLM router with available services."""
         self._ollama: Optional[OllamaService] = None
-        self._claude: Optional[ClaudeService] = None
+        self._claude_service: Optional[ClaudeService] = None
+        self._claude_pending = False
+        self._init_lock = threading.Lock()
+        self._cache: Optional[ResponseCache] = (
+            ResponseCache() if settings.llm_cache_enabled else None
+        )
+        self._semcache: Optional[SemanticCache] = (
+            SemanticCache() if settings.semantic_cache_enabled else None
+        )
+        self._ollama_cb = CircuitBreaker("ollama")
+        self._claude_cb = CircuitBreaker("claude")
+        self._latencies: Dict[str, Deque[float]] = {
+            "ollama": deque(maxlen=200),
+            "claude": deque(maxlen=200),
+        }
+        self._speculative_stats: Dict[str, Any] = {
+            "races": 0,
+            "wins": {"claude": 0, "ollama": 0},
+            "wasted_tokens": 0,
+            "wasted_cost": 0.0,
+        }
+        self._ollama_available = False
+        self._stop_event = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Task type -> routing strategy (sync and async)
+        self._dispatch: Dict[TaskType, Callable[..., Dict[str, Any]]] = {
+            **{t: self._route_local_first for t in self.LOCAL_TASKS},
+            **{t: self._route_cloud_first for t in self.CLOUD_TASKS},
+        }
+        self._adispatch: Dict[TaskType, Callable[..., Awaitable[Dict[str, Any]]]] = {
+            **{t: self._aroute_local_first for t in self.LOCAL_TASKS},
+            **{t: self._aroute_cloud_first for t in self.CLOUD_TASKS},
+        }
         self._initialize_services()
 
+        # Keep Ollama availability fresh off the request path
+        if self._ollama:
+            threading.Thread(
+                target=self._ollama_health_loop,
+                name="ollama-health",
+                daemon=True
+            ).start()
+
     def _initialize_services(self):
         """Initialize available LLM services."""
         # Initialize Ollama if enabled
         if settings.use_local_llm:
             try:
                 self._ollama = OllamaService()
-                if self._ollama.is_available():
+                self._ollama_available = self._ollama.is_available()
+                if self._ollama_available:
                     logger.info("Ollama service initialized")
                 else:
                     logger.warning("Ollama not available, will use cloud fallback")
             except Exception as e:
                 logger.warning(f"Failed to initialize Ollama: {e}")
 
-        # Initialize Claude if API key available
-        if settings.has_anthropic_key:
-            try:
-                self._claude = ClaudeService()
-                logger.info("Claude service initialized")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Claude: {e}")
+        # Claude (API key or Bedrock) is constructed on first cloud routing
+        if settings.has_claude_config:
+            self._claude_pending = True
+            logger.info("Claude configured, initializing on first cloud request")
 
         # Verify at least one service is available
         if not self._is_any_available():
             logger.error("No LLM services available!")
 
+    @property
+    def _claude(self) -> Optional[ClaudeService]:
+        """Claude service, constructed on first use (None if unavailable)."""
+        if self._claude_pending:
+            with self._init_lock:
+                if self._claude_pending:
+                    try:
+                        self._claude_service = ClaudeService()
+                        logger.info("Claude service initialized")
+                    except Exception as e:
+                        logger.warning(f"Failed to initialize Claude: {e}")
+                    self._claude_pending = False
+        return self._claude_service
+
+    @property
+    def _has_claude(self) -> bool:
+        """Check whether Claude is usable without constructing it."""
+        return self._claude_service is not None or self._claude_pending
+
+    def _claude_latency_mode(self) -> str:
+        """Claude latency mode, from settings until the service is built."""
+        if self._claude_service is not None:
+            return self._claude_service.latency_mode
+        optimized = settings.claude_use_bedrock and settings.claude_latency_optimized
+        return "optimized" if optimized else "standard"
+
+    def _ollama_health_loop(self):
+        """Background probe refreshing the cached Ollama availability flag."""
+        while not self._stop_event.wait(settings.health_probe_interval):
+            available = self._ollama.is_available()
+            if available != self._ollama_available:
+                logger.info(f"Ollama availability changed: {available}")
+            self._ollama_available = available
+
+    def close(self):
+        """Stop background work (health probe, cache flushing, batch loop)."""
+        self._stop_event.set()
+        if self._semcache is not None:
+            self._semcache.close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
     def _is_any_available(self) -> bool:
         """Check if any LLM service is available."""
-        ollama_ok = self._ollama and self._ollama.is_available()
-        claude_ok = self._claude is not None
+        ollama_ok = self._ollama is not None and self._ollama_available
+        claude_ok = self._has_claude
         return ollama_ok or claude_ok
 
     def get_status(self) -> Dict[str, Any]:
@@ -100,14 +314,28 @@ class LLMRouter:
         return {
             "ollama": {
                 "enabled": settings.use_local_llm,
-                "available": self._ollama.is_available() if self._ollama else False,
+                "available": self._ollama is not None and self._ollama_available,
                 "model": settings.ollama_model,
+                "circuit": self._ollama_cb.stats(),
+                "latency": self._latency_stats("ollama"),
             },
             "claude": {
-                "enabled": settings.has_anthropic_key,
-                "available": self._claude is not None,
+                "enabled": settings.has_claude_config,
+                "available": self._has_claude,
+                "initialized": self._claude_service is not None,
                 "model": settings.anthropic_model,
-            }
+                "latency_mode": self._claude_latency_mode(),
+                "circuit": self._claude_cb.stats(),
+                "latency": self._latency_stats("claude"),
+            },
+            "cache": self._cache.stats() if self._cache else {"enabled": False},
+            "speculative_waste": {
+                **self._speculative_stats,
+                "wins": dict(self._speculative_stats["wins"]),
+            },
+            "semantic_cache": (
+                self._semcache.stats() if self._semcache else {"enabled": False}
+            ),
         }
 
     def route_query(
@@ -130,38 +358,562 @@ class LLMRouter:
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
             force_provider: Override routing ('ollama' or 'claude')
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters ('cache=True' caches
+                non-deterministic requests too)
             
         Returns:
             Dict with 'content', 'provider', 'tokens', 'cost'
         """
-        # Convert string to enum if needed
-        if isinstance(task_type, str):
-            try:
-                task_type = TaskType(task_type)
-            except ValueError:
-                task_type = TaskType.SIMPLE_SQL
-
+        task_type = self._normalize_task_type(task_type)
         logger.info(f"Routing task: {task_type.value}")
+        kwargs.pop("speculative", None)  # racing providers needs aroute_query
+
+        cached, cache_key, use_semcache = self._lookup_caches(
+            prompt, task_type, system_prompt, max_tokens, temperature,
+            force_provider, kwargs
+        )
+        if cached is not None:
+            return cached
 
         # Handle forced provider
         if force_provider:
-            return self._route_to_provider(
+            result = self._route_to_provider(
                 force_provider, prompt, system_prompt, max_tokens, temperature, **kwargs
             )
+        else:
+            # Smart routing based on task type (local-first or cloud-first)
+            result = self._dispatch[task_type](
+                prompt, system_prompt, max_tokens, temperature, task_type, **kwargs
+            )
 
-        # Smart routing based on task type
-        if task_type in self.LOCAL_TASKS:
-            # Try local first, fallback to cloud
-            return self._route_local_first(
+        self._store_caches(
+            result, prompt, system_prompt, task_type, cache_key, use_semcache
+        )
+        return result
+
+    async def aroute_query(
+        self,
+        prompt: str,
+        task_type: TaskType | str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        force_provider: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Async variant of route_query.
+
+        Several routed calls can run concurrently with asyncio.gather;
+        caching and fallback behave exactly as in route_query.
+        Pass 'speculative=True' for latency-critical explanation/summary
+        tasks to race Claude against Ollama and keep the first good answer.
+        
+        Returns:
+            Dict with 'content', 'provider', 'tokens', 'cost'
+        """
+        task_type = self._normalize_task_type(task_type)
+        logger.info(f"Routing task (async): {task_type.value}")
+        speculative = kwargs.pop("speculative", False)
+
+        # Cache lookup may embed the prompt, keep it off the event loop
+        cached, cache_key, use_semcache = await asyncio.to_thread(
+            self._lookup_caches,
+            prompt, task_type, system_prompt, max_tokens, temperature,
+            force_provider, kwargs
+        )
+        if cached is not None:
+            return cached
+
+        if force_provider:
+            result = await self._aroute_to_provider(
+                force_provider, prompt, system_prompt, max_tokens, temperature, **kwargs
+            )
+        elif speculative and self._can_speculate(task_type):
+            result = await self._aroute_speculative(
                 prompt, system_prompt, max_tokens, temperature, task_type, **kwargs
             )
+            # A raced answer trades quality for speed for this caller only;
+            # caching it would serve it to non-speculative requests too
+            return result
         else:
-            # Try cloud first, fallback to local
-            return self._route_cloud_first(
+            result = await self._adispatch[task_type](
                 prompt, system_prompt, max_tokens, temperature, task_type, **kwargs
             )
 
+        await asyncio.to_thread(
+            self._store_caches,
+            result, prompt, system_prompt, task_type, cache_key, use_semcache
+        )
+        return result
+
+    async def astream_query(
+        self,
+        prompt: str,
+        task_type: TaskType | str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a routed call token by token.
+
+        Providers are tried in the same order as aroute_query; a provider
+        is only abandoned for the fallback before it has produced output.
+        Cache hits are replayed as a single delta.
+
+        Yields:
+            {'type': 'delta', 'text': ...} events, then one
+            {'type': 'result', 'result': {...}} event with tokens and cost
+        """
+        task_type = self._normalize_task_type(task_type)
+        logger.info(f"Streaming task: {task_type.value}")
+
+        cached, cache_key, use_semcache = await asyncio.to_thread(
+            self._lookup_caches,
+            prompt, task_type, system_prompt, max_tokens, temperature,
+            None, kwargs
+        )
+        if cached is not None:
+            yield {"type": "delta", "text": cached.get("content", "")}
+            yield {"type": "result", "result": cached}
+            return
+
+        if task_type in self.LOCAL_TASKS:
+            order = ("ollama", "claude")
+        else:
+            order = ("claude", "ollama")
+
+        last_error: Optional[Exception] = None
+        for provider in order:
+            try:
+                self._before_call(provider)
+            except Exception as e:
+                last_error = e
+                continue
+
+            service = self._ollama if provider == "ollama" else self._claude
+            breaker = self._breaker(provider)
+            started = False
+            result = None
+            start = time.perf_counter()
+            try:
+                async for event in service.generate_stream_async(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                ):
+                    if event["type"] == "result":
+                        result = event["result"]
+                    else:
+                        started = True
+                        yield event
+            except Exception as e:
+                breaker.record_failure()
+                if started:
+                    raise
+                logger.warning(f"{provider} stream failed, trying fallback: {e}")
+                last_error = e
+                continue
+            except BaseException:
+                # Consumer went away (GeneratorExit) or task was cancelled
+                breaker.release()
+                raise
+
+            breaker.record_success()
+            self._latencies[provider].append(time.perf_counter() - start)
+            if provider == "ollama":
+                self._ollama_available = True
+                result["cost"] = 0.0
+
+            await asyncio.to_thread(
+                self._store_caches,
+                result, prompt, system_prompt, task_type, cache_key, use_semcache
+            )
+            yield {"type": "result", "result": result}
+            return
+
+        raise last_error or RuntimeError("No LLM available for task")
+
+    def batch_route(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Route many independent requests for offline/bulk jobs.
+
+        Args:
+            requests: route_query keyword dicts ('prompt', 'task_type', ...)
+
+        Returns:
+            List of results in request order; failed items carry 'error'
+        """
+        # The async service clients pool connections per event loop, so every
+        # sync call must run on the same loop rather than a fresh asyncio.run
+        future = asyncio.run_coroutine_threadsafe(
+            self.abatch_route(requests), self._sync_loop()
+        )
+        return future.result()
+
+    def _sync_loop(self) -> asyncio.AbstractEventLoop:
+        """Long-lived event loop backing the sync batch wrapper."""
+        with self._init_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="llm-router-loop",
+                    daemon=True
+                ).start()
+            return self._loop
+
+    async def abatch_route(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Async variant of batch_route.
+
+        Cloud-routed requests go through the Claude Message Batches API when
+        enabled and numerous enough; everything else is routed concurrently,
+        bounded by settings.ollama_max_concurrency.
+
+        Returns:
+            List of results in request order; failed items carry 'error'
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        pending = []
+        cloud = []
+
+        for i, request in enumerate(requests):
+            request = dict(request)
+            request["task_type"] = self._normalize_task_type(
+                request.get("task_type", TaskType.SIMPLE_SQL)
+            )
+            if not request.get("force_provider") and request["task_type"] in self.CLOUD_TASKS:
+                cloud.append((i, request))
+            else:
+                pending.append((i, request))
+
+        use_batch_api = (
+            settings.allow_batch_api
+            and self._claude is not None
+            and len(cloud) >= settings.batch_api_min_size
+        )
+        if not use_batch_api:
+            pending.extend(cloud)
+
+        semaphore = asyncio.Semaphore(settings.ollama_max_concurrency)
+
+        async def run_one(index: int, request: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    results[index] = await self.aroute_query(**request)
+                except Exception as e:
+                    logger.warning(f"Batch item {index} failed: {e}")
+                    results[index] = {"content": "", "error": str(e)}
+
+        async def run_batch():
+            # Failed batch entries are routed individually afterwards
+            fallback = await self._run_claude_batch(cloud, results)
+            await asyncio.gather(*(run_one(i, r) for i, r in fallback))
+
+        # Local items must not wait for the (possibly hours-long) batch
+        jobs = [run_one(i, r) for i, r in pending]
+        if use_batch_api:
+            jobs.append(run_batch())
+        await asyncio.gather(*jobs)
+        return results
+
+    async def _run_claude_batch(
+        self,
+        items: List[Tuple[int, Dict[str, Any]]],
+        results: List[Optional[Dict[str, Any]]]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Serve cloud requests through the Batches API.
+
+        Fills results in place for cache hits and succeeded entries.
+
+        Returns:
+            Items that still need routing (failed batch entries)
+        """
+        to_submit = {}
+        for i, request in items:
+            kwargs = {
+                k: v for k, v in request.items()
+                if k not in ("prompt", "task_type", "system_prompt", "max_tokens", "temperature")
+            }
+            cached, cache_key, use_semcache = await asyncio.to_thread(
+                self._lookup_caches,
+                request["prompt"], request["task_type"], request.get("system_prompt"),
+                request.get("max_tokens", 1000), request.get("temperature", 0.7),
+                None, kwargs
+            )
+            if cached is not None:
+                results[i] = cached
+                continue
+            to_submit[str(i)] = (i, request, cache_key, use_semcache)
+
+        if not to_submit:
+            return []
+
+        batch_requests = [
+            {
+                "custom_id": custom_id,
+                "prompt": request["prompt"],
+                "system_prompt": request.get("system_prompt"),
+                "max_tokens": request.get("max_tokens", 1000),
+                "temperature": request.get("temperature", 0.7),
+            }
+            for custom_id, (_, request, _, _) in to_submit.items()
+        ]
+
+        try:
+            client = ClaudeBatchClient(self._claude)
+            batch_results = await asyncio.to_thread(client.run, batch_requests)
+        except Exception as e:
+            logger.warning(f"Claude batch failed, routing individually: {e}")
+            return [(i, request) for i, request, _, _ in to_submit.values()]
+
+        fallback = []
+        for custom_id, (i, request, cache_key, use_semcache) in to_submit.items():
+            result = batch_results.get(custom_id)
+            if result is None or "error" in result:
+                fallback.append((i, request))
+                continue
+            self._store_caches(
+                result, request["prompt"], request.get("system_prompt"),
+                request["task_type"], cache_key, use_semcache
+            )
+            results[i] = result
+
+        return fallback
+
+    @staticmethod
+    def _normalize_task_type(task_type: TaskType | str) -> TaskType:
+        """Convert string task types to the enum (unknown -> SIMPLE_SQL)."""
+        if isinstance(task_type, str):
+            try:
+                return TaskType(task_type)
+            except ValueError:
+                return TaskType.SIMPLE_SQL
+        return task_type
+
+    def _lookup_caches(
+        self,
+        prompt: str,
+        task_type: TaskType,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        force_provider: Optional[str],
+        kwargs: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], bool]:
+        """
+        Consult the exact and semantic caches.
+
+        Pops the 'cache' opt-in flag from kwargs.
+
+        Returns:
+            Tuple of (cached response or None, exact cache key, semantic flag)
+        """
+        # Exact-match cache: only deterministic requests unless opted in
+        use_cache = kwargs.pop("cache", False) or temperature == 0
+        cache_key = None
+        if self._cache and use_cache:
+            cache_key = make_cache_key(
+                task_type=task_type.value,
+                system_prompt=system_prompt,
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                provider_model=self._provider_model(force_provider),
+                kwargs=kwargs,
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit for {task_type.value}")
+                cached["cost"] = 0.0
+                cached["cached"] = True
+                return cached, cache_key, False
+
+        # Semantic cache for paraphrased cloud prompts
+        use_semcache = (
+            self._semcache is not None
+            and not force_provider
+            and task_type in self.SEMANTIC_CACHE_TASKS
+        )
+        if use_semcache:
+            try:
+                similar = self._semcache.lookup(
+                    prompt,
+                    system_prompt,
+                    task_type.value,
+                    threshold=settings.semantic_cache_threshold,
+                )
+            except Exception as e:
+                # Optional cache: a failure is just a miss
+                logger.warning(f"Semantic cache lookup failed: {e}")
+                similar = None
+            if similar is not None:
+                logger.info(f"Semantic cache hit for {task_type.value}")
+                similar["cost"] = 0.0
+                similar["cached"] = True
+                if cache_key is not None:
+                    self._cache.set(cache_key, similar)
+                return similar, cache_key, use_semcache
+
+        return None, cache_key, use_semcache
+
+    def _store_caches(
+        self,
+        result: Dict[str, Any],
+        prompt: str,
+        system_prompt: Optional[str],
+        task_type: TaskType,
+        cache_key: Optional[str],
+        use_semcache: bool
+    ):
+        """Store a fresh response in the caches selected by _lookup_caches."""
+        if cache_key is not None:
+            self._cache.set(cache_key, result)
+        if use_semcache:
+            try:
+                self._semcache.store(prompt, result, system_prompt, task_type.value)
+            except Exception as e:
+                logger.warning(f"Semantic cache store failed: {e}")
+
+    def _provider_model(self, force_provider: Optional[str] = None) -> str:
+        """Identify the provider/model combination a request may be served by."""
+        if force_provider:
+            provider = force_provider.lower()
+            model = settings.ollama_model if provider == "ollama" else settings.anthropic_model
+            return f"{provider}:{model}"
+        return f"ollama:{settings.ollama_model}|claude:{settings.anthropic_model}"
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        """Get the circuit breaker for a provider."""
+        return self._ollama_cb if provider == "ollama" else self._claude_cb
+
+    def _before_call(self, provider: str):
+        """
+        Gate a provider call on its circuit breaker and availability.
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+            RuntimeError: If the provider is not configured or not reachable
+        """
+        breaker = self._breaker(provider)
+        if provider == "ollama":
+            if not self._ollama:
+                raise RuntimeError("Ollama not available")
+        elif not self._claude:
+            raise RuntimeError("Claude not configured")
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} circuit open, skipping")
+
+        if provider == "ollama" and not self._ollama_available:
+            breaker.record_failure()
+            raise RuntimeError("Ollama not available")
+
+    def _generate(self, provider: str, **params) -> Dict[str, Any]:
+        """Call a provider through its circuit breaker."""
+        self._before_call(provider)
+        service = self._ollama if provider == "ollama" else self._claude
+        breaker = self._breaker(provider)
+        start = time.perf_counter()
+        try:
+            result = service.generate(**params)
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        self._latencies[provider].append(time.perf_counter() - start)
+        if provider == "ollama":
+            self._ollama_available = True
+            result["cost"] = 0.0  # Local is free
+        return result
+
+    async def _agenerate(
+        self,
+        provider: str,
+        hedge: bool = False,
+        **params
+    ) -> Dict[str, Any]:
+        """
+        Async call to a provider through its circuit breaker.
+
+        Args:
+            provider: 'ollama' or 'claude'
+            hedge: Give up early (p50 x multiplier) because a fallback exists
+            **params: generate_async arguments
+
+        Raises:
+            asyncio.TimeoutError: If the call exceeds its deadline
+        """
+        self._before_call(provider)
+        service = self._ollama if provider == "ollama" else self._claude
+        breaker = self._breaker(provider)
+
+        request_timeout = self._request_timeout(provider)
+        timeout = self._hedge_timeout(provider) if hedge else request_timeout
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                service.generate_async(**params), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            # Keep the cut-off time in the window so p50 isn't biased low
+            self._latencies[provider].append(time.perf_counter() - start)
+            if timeout >= request_timeout:
+                breaker.trip()
+            else:
+                # Slow is not broken: no failure, just free any probe slot
+                logger.info(f"{provider} slower than {timeout:.1f}s, falling back early")
+                breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: no outcome, but free a half-open probe slot
+            breaker.release()
+            raise
+        breaker.record_success()
+        self._latencies[provider].append(time.perf_counter() - start)
+        if provider == "ollama":
+            self._ollama_available = True
+            result["cost"] = 0.0
+        return result
+
+    @staticmethod
+    def _request_timeout(provider: str) -> float:
+        """Hard per-request timeout for a provider."""
+        if provider == "ollama":
+            return settings.ollama_request_timeout
+        return settings.claude_request_timeout
+
+    def _hedge_timeout(self, provider: str) -> float:
+        """Deadline after which a call is abandoned in favour of the fallback."""
+        request_timeout = self._request_timeout(provider)
+        samples = self._latencies[provider]
+        if settings.hedge_latency_multiplier <= 0 or len(samples) < settings.hedge_min_samples:
+            return request_timeout
+        p50 = statistics.median(samples)
+        return min(request_timeout, p50 * settings.hedge_latency_multiplier)
+
+    def _latency_stats(self, provider: str) -> Dict[str, Any]:
+        """Summarize the rolling latency window for a provider."""
+        samples = sorted(self._latencies[provider])
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": len(samples),
+            "p50": round(statistics.median(samples), 3),
+            "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "max": round(samples[-1], 3),
+        }
+
     def _route_local_first(
         self,
         prompt: str,
@@ -172,32 +924,26 @@ class LLMRouter:
         **kwargs
     ) -> Dict[str, Any]:
         """Route to local LLM first with cloud fallback."""
+        params = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+
         # Try Ollama first
-        if self._ollama and self._ollama.is_available():
+        if self._ollama:
             try:
                 logger.info(f"Routing {task_type.value} to Ollama (local)")
-                result = self._ollama.generate(
-                    prompt=prompt,
-                    system_prompt=system_prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-                result["cost"] = 0.0  # Local is free
-                return result
+                return self._generate("ollama", **params)
             except Exception as e:
                 logger.warning(f"Ollama failed, trying Claude: {e}")
 
         # Fallback to Claude
         if self._claude:
             logger.info(f"Falling back to Claude for {task_type.value}")
-            return self._claude.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
-            )
+            return self._generate("claude", **params)
 
         raise RuntimeError("No LLM available for task")
 
@@ -211,32 +957,26 @@ class LLMRouter:
         **kwargs
     ) -> Dict[str, Any]:
         """Route to cloud LLM first with local fallback."""
+        params = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+
         # Try Claude first for complex tasks
         if self._claude:
             try:
                 logger.info(f"Routing {task_type.value} to Claude (cloud)")
-                return self._claude.generate(
-                    prompt=prompt,
-                    system_prompt=system_prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
+                return self._generate("claude", **params)
             except Exception as e:
                 logger.warning(f"Claude failed, trying Ollama: {e}")
 
         # Fallback to Ollama
-        if self._ollama and self._ollama.is_available():
+        if self._ollama:
             logger.info(f"Falling back to Ollama for {task_type.value}")
-            result = self._ollama.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
-            )
-            result["cost"] = 0.0
-            return result
+            return self._generate("ollama", **params)
 
         raise RuntimeError("No LLM available for task")
 
@@ -250,31 +990,221 @@ class LLMRouter:
         **kwargs
     ) -> Dict[str, Any]:
         """Force routing to specific provider."""
-        if provider.lower() == "ollama":
-            if not self._ollama or not self._ollama.is_available():
-                raise RuntimeError("Ollama not available")
-            result = self._ollama.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
-            )
-            result["cost"] = 0.0
-            return result
+        provider = provider.lower()
+        if provider not in ("ollama", "claude"):
+            raise ValueError(f"Unknown provider: {provider}")
 
-        elif provider.lower() == "claude":
-            if not self._claude:
-                raise RuntimeError("Claude not configured")
-            return self._claude.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
+        return self._generate(
+            provider,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+
+    async def _aroute_local_first(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        task_type: TaskType,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async route to local LLM first with cloud fallback."""
+        params = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+
+        if self._ollama:
+            try:
+                logger.info(f"Routing {task_type.value} to Ollama (local)")
+                return await self._agenerate(
+                    "ollama", hedge=self._fallback_ready("claude"), **params
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Ollama timed out, trying Claude")
+            except Exception as e:
+                logger.warning(f"Ollama failed, trying Claude: {e}")
+
+        if self._claude:
+            logger.info(f"Falling back to Claude for {task_type.value}")
+            return await self._agenerate("claude", **params)
+
+        raise RuntimeError("No LLM available for task")
+
+    async def _aroute_cloud_first(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        task_type: TaskType,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async route to cloud LLM first with local fallback."""
+        params = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+
+        if self._claude:
+            try:
+                logger.info(f"Routing {task_type.value} to Claude (cloud)")
+                return await self._agenerate(
+                    "claude", hedge=self._fallback_ready("ollama"), **params
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Claude timed out, trying Ollama")
+            except Exception as e:
+                logger.warning(f"Claude failed, trying Ollama: {e}")
+
+        if self._ollama:
+            logger.info(f"Falling back to Ollama for {task_type.value}")
+            return await self._agenerate("ollama", **params)
+
+        raise RuntimeError("No LLM available for task")
+
+    def _fallback_ready(self, provider: str) -> bool:
+        """
+        Check whether a provider can take over if the current call is cut off.
+
+        Hedging only pays off when the fallback can actually answer;
+        otherwise a slow-but-working call would be abandoned for an error.
+        """
+        if provider == "ollama":
+            return (
+                self._ollama is not None
+                and self._ollama_available
+                and self._ollama_cb.state == CircuitBreaker.CLOSED
             )
+        # Builds Claude if still pending: a configured-but-broken client is no fallback
+        return self._claude is not None and self._claude_cb.state == CircuitBreaker.CLOSED
+
+    def _can_speculate(self, task_type: TaskType) -> bool:
+        """Check whether both providers can be raced for a task."""
+        return (
+            task_type in self.SPECULATIVE_TASKS
+            and self._claude is not None
+            and self._ollama is not None
+            and self._ollama_available
+            # Only race healthy providers so a cancelled loser never holds
+            # a half-open probe
+            and self._claude_cb.state == CircuitBreaker.CLOSED
+            and self._ollama_cb.state == CircuitBreaker.CLOSED
+        )
 
-        raise ValueError(f"Unknown provider: {provider}")
+    @staticmethod
+    def _is_acceptable(result: Dict[str, Any]) -> bool:
+        """Cheap confidence check for a speculative response."""
+        if not result.get("content", "").strip():
+            return False
+        return result.get("stop_reason") != "max_tokens" and result.get("done", True)
+
+    async def _aroute_speculative(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        task_type: TaskType,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Race Claude and Ollama, returning the first acceptable response.
+
+        The slower call is cancelled. Tokens spent on discarded responses
+        (and the prompt sent to a cancelled Claude call) are tracked in
+        get_status()['speculative_waste'].
+        """
+        params = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+        logger.info(f"Racing Claude and Ollama for {task_type.value}")
+        tasks = {
+            asyncio.create_task(self._agenerate(provider, **params)): provider
+            for provider in ("claude", "ollama")
+        }
+        stats = self._speculative_stats
+        stats["races"] += 1
+
+        pending = set(tasks)
+        fallback: Optional[Dict[str, Any]] = None
+        error: Optional[BaseException] = None
+        winner: Optional[Dict[str, Any]] = None
+        winner_provider = None
+
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        logger.warning(f"Speculative {tasks[task]} call failed: {error}")
+                        continue
+                    result = task.result()
+                    if winner is None and self._is_acceptable(result):
+                        winner, winner_provider = result, tasks[task]
+                    else:
+                        # Completed but unused
+                        stats["wasted_tokens"] += result.get("tokens", 0)
+                        stats["wasted_cost"] += result.get("cost", 0.0)
+                        if fallback is None:
+                            fallback = result
+        finally:
+            for task in pending:
+                task.cancel()
+                if tasks[task] == "claude":
+                    stats["wasted_tokens"] += self._claude.count_tokens(
+                        (system_prompt or "") + prompt
+                    )
+
+        if winner is not None:
+            stats["wins"][winner_provider] += 1
+            return winner
+        if fallback is not None:
+            # Neither answer passed the check; return the first one anyway
+            stats["wasted_tokens"] -= fallback.get("tokens", 0)
+            stats["wasted_cost"] -= fallback.get("cost", 0.0)
+            return fallback
+        raise error or RuntimeError("No LLM available for task")
+
+    async def _aroute_to_provider(
+        self,
+        provider: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async forced routing to specific provider."""
+        provider = provider.lower()
+        if provider not in ("ollama", "claude"):
+            raise ValueError(f"Unknown provider: {provider}")
+
+        return await self._agenerate(
+            provider,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
 
     def estimate_cost(
         self,
@@ -292,24 +1222,17 @@ class LLMRouter:
             Dict with cost estimates per provider
         """
         # Convert string to enum
-        if isinstance(task_type, str):
-            try:
-                task_type = TaskType(task_type)
-            except ValueError:
-                task_type = TaskType.SIMPLE_SQL
+        task_type = self._normalize_task_type(task_type)
 
         # Ollama is always free
         ollama_cost = 0.0
 
         # Claude cost (Sonnet pricing)
-        # Assume ~40% input, 60% output split
-        input_tokens = int(estimated_tokens * 0.4)
-        output_tokens = int(estimated_tokens * 0.6)
-        claude_cost = (input_tokens * 3.0 / 1_000_000) + (output_tokens * 15.0 / 1_000_000)
+        claude_cost = _estimate_claude_cost(estimated_tokens)
 
         return {
             "ollama": ollama_cost,
-            "claude": round(claude_cost, 6),
+            "claude": claude_cost,
             "recommended": "ollama" if task_type in self.LOCAL_TASKS else "claude",
             "task_type": task_type.value
         }
@@ -324,24 +1247,7 @@ class LLMRouter:
         Returns:
             Dict with complexity analysis
         """
-        query_lower = query.lower()
-
-        # Complex indicators
-        complex_indicators = [
-            "join", "subquery", "having", "window function", "partition",
-            "case when", "union", "intersect", "complex", "nested",
-            "multiple tables", "across", "compare", "trend", "forecast"
-        ]
-
-        # Medium indicators
-        medium_indicators = [
-            "group by", "order by", "filter", "aggregate", "sum", "count",
-            "average", "total", "by region", "by month", "top", "bottom"
-        ]
-
-        # Count indicators
-        complex_count = sum(1 for ind in complex_indicators if ind in query_lower)
-        medium_count = sum(1 for ind in medium_indicators if ind in query_lower)
+        complex_count, medium_count = _count_indicators(query.lower())
 
         # Determine complexity
         if complex_count >= 2 or (complex_count >= 1 and medium_count >= 2):
@@ -365,11 +1271,14 @@ class LLMRouter:
 
 # Create singleton instance
 _router_instance: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
 
 
 def get_llm_router() -> LLMRouter:
-    """Get or create LLM router singleton."""
+    """Get or create LLM router singleton (thread-safe)."""
     global _router_instance
     if _router_instance is None:
-        _router_instance = LLMRouter()
+        with _router_lock:
+            if _router_instance is None:
+                _router_instance = LLMRouter()
     return _router_instance
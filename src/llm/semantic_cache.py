@@ -0,0 +1,275 @@
+"""
+DataGenie AI - Semantic Response Cache
+
+Embedding-based cache that serves paraphrased prompts from earlier
+responses. Uses sentence-transformers for embeddings and a FAISS
+inner-product index over normalized vectors (cosine similarity).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Semantic LLM response cache.
+
+    Features:
+    - Cosine-similarity lookup with configurable threshold
+    - Entries scoped by task type and system prompt
+    - Bounded size with oldest-first eviction
+    - Background disk persistence (FAISS index + JSONL sidecar)
+    """
+
+    INDEX_FILE = "index.faiss"
+    ENTRIES_FILE = "entries.jsonl"
+
+    def __init__(
+        self,
+        persist_dir: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            persist_dir: Directory for index persistence (default from settings)
+            embedding_model: Sentence transformer model (default from settings)
+            max_entries: Maximum cached entries (default from settings)
+            flush_interval: Seconds between background flushes (default from settings)
+        """
+        self.persist_dir = Path(persist_dir or settings.semantic_cache_dir)
+        self.embedding_model = embedding_model or settings.embedding_model
+        self.max_entries = max_entries or settings.semantic_cache_max_entries
+        self.flush_interval = flush_interval or settings.semantic_cache_flush_interval
+
+        self._model = None
+        self._index = None
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    def _initialize(self):
+        """Load embedding model and index on first use."""
+        if self._initialized:
+            return
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if self._initialized:
+                return
+            try:
+                self._load()
+            except ImportError as e:
+                logger.warning(f"Semantic cache disabled, missing dependency: {e}")
+                self.enabled = False
+            except Exception as e:
+                logger.warning(f"Semantic cache disabled: {e}")
+                self.enabled = False
+            # Only publish once the model/index are ready (or disabled)
+            self._initialized = True
+
+    def _load(self):
+        """Load the embedding model and the persisted index (lock held)."""
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(self.embedding_model)
+        dim = self._model.get_sentence_embedding_dimension()
+
+        index_path = self.persist_dir / self.INDEX_FILE
+        entries_path = self.persist_dir / self.ENTRIES_FILE
+        if index_path.exists() and entries_path.exists():
+            self._index = faiss.read_index(str(index_path))
+            with open(entries_path, encoding="utf-8") as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+            if self._index.ntotal != len(self._entries):
+                logger.warning("Semantic cache index out of sync, rebuilding")
+                self._index = faiss.IndexFlatIP(dim)
+                self._entries = []
+        else:
+            self._index = faiss.IndexFlatIP(dim)
+
+        logger.info(f"Semantic cache loaded with {len(self._entries)} entries")
+
+        # Persist off the request path
+        threading.Thread(
+            target=self._flush_loop,
+            name="semantic-cache-flush",
+            daemon=True
+        ).start()
+
+    @staticmethod
+    def _scope(task_type: str, system_prompt: Optional[str]) -> str:
+        """Scope key so entries never cross task types or system prompts."""
+        raw = f"{task_type}\x00{system_prompt or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str):
+        """Embed text as a normalized float32 row vector."""
+        return self._model.encode(
+            [text], normalize_embeddings=True, convert_to_numpy=True
+        ).astype("float32")
+
+    def lookup(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        task_type: str,
+        threshold: float = 0.92
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for a semantically similar prompt.
+
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            task_type: Task type value
+            threshold: Minimum cosine similarity for a hit
+
+        Returns:
+            Cached response dict (with 'similarity') or None
+        """
+        self._initialize()
+        if not self.enabled:
+            return None
+
+        scope = self._scope(task_type, system_prompt)
+        vector = self._embed(prompt)
+
+        with self._lock:
+            if self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            k = min(10, self._index.ntotal)
+            scores, ids = self._index.search(vector, k)
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < threshold:
+                    break
+                entry = self._entries[idx]
+                if entry["scope"] == scope:
+                    self.hits += 1
+                    response = dict(entry["response"])
+                    response["similarity"] = round(float(score), 4)
+                    return response
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        prompt: str,
+        result: Dict[str, Any],
+        system_prompt: Optional[str],
+        task_type: str
+    ):
+        """
+        Store a response for future similarity lookups.
+
+        Args:
+            prompt: User prompt
+            result: Response dict (cost is stripped before storing)
+            system_prompt: System instructions
+            task_type: Task type value
+        """
+        self._initialize()
+        if not self.enabled:
+            return
+
+        entry = {
+            "scope": self._scope(task_type, system_prompt),
+            "task_type": task_type,
+            "prompt": prompt,
+            "response": {k: v for k, v in result.items() if k != "cost"},
+        }
+        vector = self._embed(prompt)
+
+        with self._lock:
+            self._index.add(vector)
+            self._entries.append(entry)
+            self._evict()
+            self._dirty = True
+
+    def _evict(self):
+        """Drop the oldest entries once over max_entries (lock held)."""
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+
+        import faiss
+
+        # Evict a chunk at a time; removal compacts the flat index
+        count = max(overflow, self.max_entries // 10)
+        self._index.remove_ids(faiss.IDSelectorRange(0, count))
+        del self._entries[:count]
+        logger.debug(f"Semantic cache evicted {count} entries")
+
+    def _flush_loop(self):
+        """Background loop writing pending changes to disk."""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the index and entries to disk if anything changed."""
+        import faiss
+
+        with self._lock:
+            if not self._dirty:
+                return
+            # Snapshot under the lock, write without it
+            data = faiss.serialize_index(self._index)
+            entries = list(self._entries)
+            self._dirty = False
+
+        try:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            index_tmp = self.persist_dir / f"{self.INDEX_FILE}.tmp"
+            entries_tmp = self.persist_dir / f"{self.ENTRIES_FILE}.tmp"
+            index_tmp.write_bytes(data.tobytes())
+            with open(entries_tmp, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, default=str) + "\n")
+            os.replace(index_tmp, self.persist_dir / self.INDEX_FILE)
+            os.replace(entries_tmp, self.persist_dir / self.ENTRIES_FILE)
+        except Exception as e:
+            logger.warning(f"Failed to persist semantic cache: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def close(self):
+        """Stop background persistence and flush pending entries."""
+        self._stop_event.set()
+        if self._initialized and self.enabled:
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hits, misses, entry count and capacity
+        """
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
@@ -5,9 +5,10 @@ Main SQL generation engine with 92% accuracy target.
 Uses hybrid LLM approach with RAG enhancement.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, AsyncGenerator
+from dataclasses import dataclass, asdict
 
 from ..llm.router import LLMRouter, TaskType, get_llm_router
 from ..rag.retriever import RAGRetriever
@@ -47,8 +48,9 @@ class TextToSQLGenerator:
     6. Explain query
     """
 
-    # SQL generation prompt template
-    SQL_PROMPT_TEMPLATE = """You are an expert SQL query generator. Convert natural language queries to SQL.
+    # SQL generation system prompt: static per database, so it is sent as
+    # the system prompt and can be served from the provider's prompt cache
+    SQL_SYSTEM_TEMPLATE = """You are an expert SQL query generator. Convert natural language queries to SQL.
 
 IMPORTANT RULES:
 1. Generate only valid SQL syntax
@@ -58,9 +60,10 @@ IMPORTANT RULES:
 5. Add ORDER BY and LIMIT for ranking queries
 6. Return ONLY the SQL query, no explanations
 
-{schema_context}
+{schema_context}"""
 
-{examples}
+    # SQL generation prompt template (per-query part)
+    SQL_PROMPT_TEMPLATE = """{examples}
 
 User Query: {query}
 
@@ -114,6 +117,143 @@ SQL:"""
         """
         logger.info(f"Generating SQL for: {query[:50]}...")
 
+        context = self._prepare(query, database, use_rag)
+
+        response = self.llm_router.route_query(
+            prompt=context["prompt"],
+            task_type=context["task_type"],
+            system_prompt=context["system_prompt"],
+            max_tokens=500,
+            temperature=0.1  # Low temp for deterministic SQL
+        )
+
+        sql = self._extract_sql(response["content"])
+
+        # Step 8: Validate SQL
+        validation_status = "valid"
+        validation_errors = []
+        
+        if validate:
+            is_valid, errors = self.validator.validate(sql)
+            validation_status = "valid" if is_valid else "invalid"
+            validation_errors = errors
+
+            # Retry with Claude if validation fails
+            if not is_valid and context["task_type"] == TaskType.SIMPLE_SQL:
+                logger.info("Retrying with Claude due to validation error")
+                sql, validation_status, validation_errors = self._retry_with_claude(
+                    query, context["schema_context"], context["examples"], errors
+                )
+
+        return self._build_result(
+            query, sql, context, response, validation_status, validation_errors
+        )
+
+    async def agenerate(
+        self,
+        query: str,
+        database: str = "default",
+        use_rag: bool = True,
+        validate: bool = True
+    ) -> SQLGenerationResult:
+        """
+        Async variant of generate.
+
+        The LLM calls are awaited through the router so the API event loop
+        can serve other requests while generation is in flight.
+        """
+        logger.info(f"Generating SQL (async) for: {query[:50]}...")
+
+        context = await asyncio.to_thread(self._prepare, query, database, use_rag)
+
+        response = await self.llm_router.aroute_query(
+            prompt=context["prompt"],
+            task_type=context["task_type"],
+            system_prompt=context["system_prompt"],
+            max_tokens=500,
+            temperature=0.1
+        )
+
+        return await self._afinish(query, context, response, validate)
+
+    async def astream(
+        self,
+        query: str,
+        database: str = "default",
+        use_rag: bool = True,
+        validate: bool = True
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream SQL generation.
+
+        SQL tokens are yielded as they arrive from the LLM; validation,
+        scoring and explanation run once the stream completes.
+
+        Yields:
+            {'type': 'delta', 'text': ...} events, then one
+            {'type': 'result', 'result': {...}} event (SQLGenerationResult as dict)
+        """
+        logger.info(f"Generating SQL (stream) for: {query[:50]}...")
+
+        context = await asyncio.to_thread(self._prepare, query, database, use_rag)
+
+        response = None
+        async for event in self.llm_router.astream_query(
+            prompt=context["prompt"],
+            task_type=context["task_type"],
+            system_prompt=context["system_prompt"],
+            max_tokens=500,
+            temperature=0.1
+        ):
+            if event["type"] == "result":
+                response = event["result"]
+            else:
+                yield event
+
+        result = await self._afinish(query, context, response, validate)
+        yield {"type": "result", "result": asdict(result)}
+
+    async def _afinish(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        response: Dict[str, Any],
+        validate: bool
+    ) -> SQLGenerationResult:
+        """Extract, validate (retrying with Claude if needed) and package SQL."""
+        sql = self._extract_sql(response["content"])
+
+        validation_status = "valid"
+        validation_errors = []
+
+        if validate:
+            is_valid, errors = self.validator.validate(sql)
+            validation_status = "valid" if is_valid else "invalid"
+            validation_errors = errors
+
+            if not is_valid and context["task_type"] == TaskType.SIMPLE_SQL:
+                logger.info("Retrying with Claude due to validation error")
+                sql, validation_status, validation_errors = await self._aretry_with_claude(
+                    query, context["schema_context"], context["examples"], errors
+                )
+
+        return self._build_result(
+            query, sql, context, response, validation_status, validation_errors
+        )
+
+    def _prepare(
+        self,
+        query: str,
+        database: str,
+        use_rag: bool
+    ) -> Dict[str, Any]:
+        """
+        Run the pre-LLM pipeline steps.
+
+        Returns:
+            Dict with entities, intent, complexity, schema_context,
+            examples, system_prompt, prompt and task_type
+        """
         # Step 1: Extract entities
         entities = self.ner_extractor.extract_entities_dict(query)
         logger.debug(f"Extracted {len(entities)} entities")
@@ -134,55 +274,52 @@ SQL:"""
             examples = self.rag_retriever.get_few_shot_examples(query, n_examples=3)
 
         # Step 6: Build prompt
+        system_prompt = self.SQL_SYSTEM_TEMPLATE.format(schema_context=schema_context)
         prompt = self.SQL_PROMPT_TEMPLATE.format(
-            schema_context=schema_context,
             examples=f"Examples:\n{examples}" if examples else "",
             query=query
         )
 
-        # Step 7: Determine task type and generate SQL
+        # Step 7: Determine task type
         task_type = TaskType.SIMPLE_SQL if complexity == "low" else TaskType.COMPLEX_SQL
 
-        response = self.llm_router.route_query(
-            prompt=prompt,
-            task_type=task_type,
-            max_tokens=500,
-            temperature=0.1  # Low temp for deterministic SQL
-        )
-
-        sql = self._extract_sql(response["content"])
-
-        # Step 8: Validate SQL
-        validation_status = "valid"
-        validation_errors = []
-        
-        if validate:
-            is_valid, errors = self.validator.validate(sql)
-            validation_status = "valid" if is_valid else "invalid"
-            validation_errors = errors
-
-            # Retry with Claude if validation fails
-            if not is_valid and task_type == TaskType.SIMPLE_SQL:
-                logger.info("Retrying with Claude due to validation error")
-                sql, validation_status, validation_errors = self._retry_with_claude(
-                    query, schema_context, examples, errors
-                )
+        return {
+            "entities": entities,
+            "intent": intent,
+            "complexity": complexity,
+            "schema_context": schema_context,
+            "examples": examples,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "task_type": task_type,
+        }
 
+    def _build_result(
+        self,
+        query: str,
+        sql: str,
+        context: Dict[str, Any],
+        response: Dict[str, Any],
+        validation_status: str,
+        validation_errors: List[str]
+    ) -> SQLGenerationResult:
+        """Score, explain and package a generated query."""
         # Step 9: Calculate confidence
         confidence = self._calculate_confidence(
-            sql, query, complexity, validation_status, bool(examples)
+            sql, query, context["complexity"], validation_status,
+            bool(context["examples"])
         )
 
         # Step 10: Generate explanation
-        explanation = self._generate_explanation(sql, query, entities)
+        explanation = self._generate_explanation(sql, query, context["entities"])
 
         return SQLGenerationResult(
             sql=sql,
             confidence=confidence,
             explanation=explanation,
-            complexity=complexity,
-            entities=entities,
-            intent=intent,
+            complexity=context["complexity"],
+            entities=context["entities"],
+            intent=context["intent"],
             cost_estimate=response.get("cost", 0.0),
             provider=response.get("provider", "unknown"),
             validation_status=validation_status,
@@ -359,12 +496,56 @@ SQL:"""
         """
         Retry SQL generation with Claude after validation failure.
         """
+        response = self.llm_router.route_query(
+            prompt=self._build_retry_prompt(query, examples, errors),
+            system_prompt=self.SQL_SYSTEM_TEMPLATE.format(schema_context=schema_context),
+            task_type=TaskType.COMPLEX_SQL,
+            force_provider="claude",
+            max_tokens=500,
+            temperature=0.1
+        )
+
+        sql = self._extract_sql(response["content"])
+        is_valid, new_errors = self.validator.validate(sql)
+
+        return sql, "valid" if is_valid else "invalid", new_errors
+
+    async def _aretry_with_claude(
+        self,
+        query: str,
+        schema_context: str,
+        examples: str,
+        errors: List[str]
+    ) -> tuple:
+        """
+        Async retry of SQL generation with Claude after validation failure.
+        """
+        response = await self.llm_router.aroute_query(
+            prompt=self._build_retry_prompt(query, examples, errors),
+            system_prompt=self.SQL_SYSTEM_TEMPLATE.format(schema_context=schema_context),
+            task_type=TaskType.COMPLEX_SQL,
+            force_provider="claude",
+            max_tokens=500,
+            temperature=0.1
+        )
+
+        sql = self._extract_sql(response["content"])
+        is_valid, new_errors = self.validator.validate(sql)
+
+        return sql, "valid" if is_valid else "invalid", new_errors
+
+    def _build_retry_prompt(
+        self,
+        query: str,
+        examples: str,
+        errors: List[str]
+    ) -> str:
+        """Build the SQL prompt with previous validation errors appended."""
         error_context = "\n".join([f"- {e}" for e in errors])
         examples_block = f"Examples:\n{examples}" if examples else ""
 
-        retry_prompt = (
+        return (
             self.SQL_PROMPT_TEMPLATE.format(
-                schema_context=schema_context,
                 examples=examples_block,
                 query=query
             )
@@ -378,20 +559,6 @@ SQL:"""
         SQL:"""
         )
 
-
-        response = self.llm_router.route_query(
-            prompt=retry_prompt,
-            task_type=TaskType.COMPLEX_SQL,
-            force_provider="claude",
-            max_tokens=500,
-            temperature=0.1
-        )
-
-        sql = self._extract_sql(response["content"])
-        is_valid, new_errors = self.validator.validate(sql)
-
-        return sql, "valid" if is_valid else "invalid", new_errors
-
     def generate_dict(
         self,
         query: str,
@@ -4,11 +4,14 @@ DataGenie AI - Streamlit User Interface
 Web-based interface for the BI assistant.
 """
 
+import hashlib
+import json
+from collections import deque
 import streamlit as st
-import requests
+import httpx
 import pandas as pd
-import plotly.express as px
-from typing import Dict, Any, Optional
+import plotly.graph_objects as go
+from typing import Dict, Any
 
 # Page Configuration
 st.set_page_config(
@@ -23,45 +26,78 @@ API_URL = "http://localhost:8000"
 
 # Session State
 if "query_history" not in st.session_state:
-    st.session_state.query_history = []
+    # Bounded ring buffer: long sessions keep only the most recent queries
+    st.session_state.query_history = deque(maxlen=100)
 if "current_result" not in st.session_state:
     st.session_state.current_result = None
 
 # Helper Functions
+@st.cache_resource
+def get_http() -> httpx.Client:
+    """Shared keep-alive client, reused across Streamlit reruns."""
+    return httpx.Client(base_url=API_URL, timeout=httpx.Timeout(60.0, connect=5.0))
+
+@st.cache_data(ttl=5)
 def check_api_health() -> Dict[str, Any]:
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        response = get_http().get("/health", timeout=5)
         if response.status_code == 200:
             return response.json()
     except Exception:
         pass
     return {"status": "unhealthy"}
 
-def process_query(query: str, database: str, use_rag: bool) -> Optional[Dict]:
-    try:
-        response = requests.post(
-            f"{API_URL}/query",
-            json={"query": query, "database": database, "use_rag": use_rag},
-            timeout=60
-        )
-        if response.status_code == 200:
-            return response.json()
-        st.error(f"API Error: {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        st.error("Cannot connect to API. Start the server with: uvicorn src.api.main:app --reload")
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-    return None
+def query_key(query: str, database: str, use_rag: bool) -> str:
+    """Stable hash identifying a query request in the history."""
+    return hashlib.sha256(f"{database}|{use_rag}|{query}".encode("utf-8")).hexdigest()
+
+def stream_query(query: str, database: str, use_rag: bool, final: Dict[str, Any]):
+    """Yield SQL chunks from /query/stream; the trailing result/error lands in `final`."""
+    with get_http().stream(
+        "POST",
+        "/query/stream",
+        json={"query": query, "database": database, "use_rag": use_rag}
+    ) as response:
+        if response.status_code != 200:
+            final["error"] = f"API Error: {response.status_code}"
+            return
+        for line in response.iter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "delta":
+                yield event["text"]
+            elif event["type"] == "result":
+                final["result"] = event["result"]
+            elif event["type"] == "error":
+                final["error"] = event["detail"]
 
+@st.cache_data(ttl=60)
 def get_examples():
     try:
-        response = requests.get(f"{API_URL}/examples", timeout=5)
+        response = get_http().get("/examples", timeout=5)
         if response.status_code == 200:
             return response.json()
     except Exception:
         pass
     return {"examples": ["Show me total revenue", "Top 10 products by sales"]}
 
+@st.cache_data
+def build_intent_fig(items: tuple) -> go.Figure:
+    """Horizontal intent score bars, memoized per distinct score set."""
+    items = sorted(items, key=lambda item: item[1])
+    fig = go.Figure(go.Bar(
+        x=[score for _, score in items],
+        y=[intent for intent, _ in items],
+        orientation="h"
+    ))
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=10, b=10),
+        xaxis_title="Score",
+        yaxis_title="Intent"
+    )
+    return fig
+
 # Sidebar
 with st.sidebar:
     st.title("🧞 DataGenie AI")
@@ -74,6 +110,8 @@ with st.sidebar:
     st.markdown("---")
     
     st.header("🔌 API Status")
+    if st.button("🔄 Refresh"):
+        check_api_health.clear()
     health = check_api_health()
     if health.get("status") == "healthy":
         st.success("✅ Connected")
@@ -110,15 +148,36 @@ with col2:
 
 # Process Query
 if submit and query:
-    with st.spinner("🧠 Generating SQL..."):
-        result = process_query(query, database, use_rag)
-        if result:
-            st.session_state.current_result = result
-            st.session_state.query_history.append({
-                "query": query,
-                "sql": result["sql"],
-                "confidence": result["confidence"]
-            })
+    final: Dict[str, Any] = {}
+    placeholder = st.empty()
+    try:
+        with placeholder.container():
+            st.caption("🧠 Generating SQL...")
+            st.write_stream(stream_query(query, database, use_rag, final))
+    except httpx.ConnectError:
+        st.error("Cannot connect to API. Start the server with: uvicorn src.api.main:app --reload")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+    placeholder.empty()
+
+    if final.get("error"):
+        st.error(final["error"])
+    result = final.get("result")
+    if result:
+        st.session_state.current_result = result
+        # Re-running a query moves it to the top instead of duplicating it
+        key = query_key(query, database, use_rag)
+        history = st.session_state.query_history
+        for item in history:
+            if item.get("key") == key:
+                history.remove(item)
+                break
+        history.append({
+            "key": key,
+            "query": query,
+            "sql": result["sql"],
+            "confidence": result["confidence"]
+        })
 
 # Display Results
 if st.session_state.current_result:
@@ -155,25 +214,26 @@ if st.session_state.current_result:
     with tab2:
         st.subheader("Extracted Entities")
         if result["entities"]:
-            df = pd.DataFrame(result["entities"])
-            st.dataframe(df[["text", "label", "confidence"]], use_container_width=True)
+            df = pd.DataFrame.from_records(
+                result["entities"], columns=["text", "label", "confidence"]
+            )
+            st.dataframe(df, use_container_width=True)
         else:
             st.info("No entities extracted")
         
         st.subheader("Intent Scores")
         scores = result["intent"].get("all_scores", {})
         if scores:
-            df = pd.DataFrame([{"Intent": k, "Score": v} for k, v in scores.items()])
-            fig = px.bar(df.sort_values("Score"), x="Score", y="Intent", orientation="h")
+            fig = build_intent_fig(tuple(sorted(scores.items())))
             st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.subheader("Query History")
-        for item in reversed(st.session_state.query_history[-10:]):
+        for item in list(st.session_state.query_history)[-10:][::-1]:
             with st.expander(item['query'][:50]):
                 st.code(item['sql'], language="sql")
         if st.button("Clear History"):
-            st.session_state.query_history = []
+            st.session_state.query_history.clear()
             st.rerun()
 
 # Footer
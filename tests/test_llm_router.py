@@ -0,0 +1,905 @@
+"""
+DataGenie AI - LLM Router Tests
+
+Routing, caching and fallback behaviour with stubbed LLM services.
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeService:
+    """Stand-in for OllamaService/ClaudeService that records calls."""
+
+    latency_mode = "standard"
+
+    def __init__(self, provider: str, fail: bool = False, delay: float = 0.0):
+        self.provider = provider
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def generate(self, prompt, system_prompt=None, max_tokens=1000,
+                 temperature=0.7, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.provider} down")
+        return {
+            "content": f"{self.provider}:{prompt}",
+            "tokens": 10,
+            "cost": 0.01,
+            "provider": self.provider,
+        }
+
+    def count_tokens(self, text):
+        return len(text) // 4
+
+    async def generate_async(self, prompt, system_prompt=None, max_tokens=1000,
+                             temperature=0.7, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self.generate(prompt, system_prompt, max_tokens, temperature, **kwargs)
+
+    async def generate_stream_async(self, prompt, system_prompt=None, max_tokens=1000,
+                                    temperature=0.7, **kwargs):
+        result = self.generate(prompt, system_prompt, max_tokens, temperature, **kwargs)
+        for word in result["content"].split(":"):
+            yield {"type": "delta", "text": word}
+        yield {"type": "result", "result": result}
+
+
+def collect_stream(router, *args, **kwargs):
+    """Drain astream_query into (delta texts, final result)."""
+    async def run():
+        deltas, final = [], None
+        async for event in router.astream_query(*args, **kwargs):
+            if event["type"] == "delta":
+                deltas.append(event["text"])
+            else:
+                final = event["result"]
+        return deltas, final
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def router(monkeypatch):
+    """Router with no real services, wired to fakes."""
+    from src.config import settings
+    from src.llm.router import LLMRouter
+
+    monkeypatch.setattr(settings, "use_local_llm", False)
+    monkeypatch.setattr(settings, "anthropic_api_key", None)
+    monkeypatch.setattr(settings, "redis_url", None)
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+
+    router = LLMRouter()
+    router._ollama = FakeService("ollama")
+    router._ollama_available = True
+    router._claude_service = FakeService("claude")
+    return router
+
+
+class TestResponseCache:
+    """Test exact-match response caching."""
+
+    def test_deterministic_requests_are_cached(self, router):
+        first = router.route_query("total revenue", "simple_sql", temperature=0)
+        second = router.route_query("total revenue", "simple_sql", temperature=0)
+
+        assert router._ollama.calls == 1
+        assert second["content"] == first["content"]
+        assert second["cached"] is True
+        assert second["cost"] == 0.0
+
+        stats = router.get_status()["cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_sampled_requests_bypass_cache(self, router):
+        router.route_query("total revenue", "simple_sql", temperature=0.7)
+        router.route_query("total revenue", "simple_sql", temperature=0.7)
+
+        assert router._ollama.calls == 2
+
+    def test_opt_in_cache(self, router):
+        router.route_query("total revenue", "simple_sql", temperature=0.7, cache=True)
+        router.route_query("total revenue", "simple_sql", temperature=0.7, cache=True)
+
+        assert router._ollama.calls == 1
+
+    def test_key_includes_task_type(self, router):
+        router.route_query("total revenue", "simple_sql", temperature=0)
+        router.route_query("total revenue", "explanation", temperature=0)
+
+        assert router._ollama.calls == 1
+        assert router._claude.calls == 1
+
+    def test_lru_eviction(self):
+        from src.llm.cache import ResponseCache
+
+        cache = ResponseCache(max_size=2, redis_url=None)
+        cache.set("a", {"content": "a"})
+        cache.set("b", {"content": "b"})
+        cache.get("a")
+        cache.set("c", {"content": "c"})
+
+        assert cache.get("b") is None
+        assert cache.get("a")["content"] == "a"
+        assert cache.get("c")["content"] == "c"
+
+
+class FakeSemanticCache:
+    """In-memory semantic cache matching on lowercased prompt."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def lookup(self, prompt, system_prompt, task_type, threshold=0.92):
+        entry = self.entries.get((task_type, prompt.lower()))
+        return dict(entry) if entry else None
+
+    def store(self, prompt, result, system_prompt, task_type):
+        self.entries[(task_type, prompt.lower())] = dict(result)
+
+
+class TestSemanticCache:
+    """Test semantic cache gating in the router."""
+
+    def test_paraphrase_served_for_explanation(self, router):
+        router._semcache = FakeSemanticCache()
+
+        router.route_query("Explain revenue", "explanation")
+        result = router.route_query("explain REVENUE", "explanation")
+
+        assert router._claude.calls == 1
+        assert result["cached"] is True
+
+    def test_sql_never_semantically_cached(self, router):
+        router._semcache = FakeSemanticCache()
+
+        router.route_query("Join sales", "complex_sql")
+        router.route_query("join SALES", "complex_sql")
+
+        assert router._claude.calls == 2
+        assert router._semcache.entries == {}
+
+    def test_semantic_cache_errors_are_misses(self, router):
+        class BrokenSemanticCache:
+            def lookup(self, *args, **kwargs):
+                raise AttributeError("'NoneType' object has no attribute 'encode'")
+
+            def store(self, *args, **kwargs):
+                raise RuntimeError("disk full")
+
+        router._semcache = BrokenSemanticCache()
+
+        result = router.route_query("Explain revenue", "explanation")
+
+        assert result["provider"] == "claude"
+
+    def test_concurrent_initialize_waits_for_load(self, tmp_path, monkeypatch):
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.llm.semantic_cache import SemanticCache
+
+        cache = SemanticCache(persist_dir=str(tmp_path))
+        loads = []
+
+        def slow_load():
+            time.sleep(0.05)
+            loads.append(1)
+            cache._model = object()
+
+        monkeypatch.setattr(cache, "_load", slow_load)
+
+        def init(_):
+            cache._initialize()
+            return cache._model
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            models = list(pool.map(init, range(4)))
+
+        assert len(loads) == 1
+        assert all(model is not None for model in models)
+
+    def test_eviction_and_background_flush(self, tmp_path, monkeypatch):
+        import types
+        from src.llm.semantic_cache import SemanticCache
+
+        class FakeIndex:
+            def __init__(self):
+                self.rows = []
+
+            @property
+            def ntotal(self):
+                return len(self.rows)
+
+            def add(self, vector):
+                self.rows.append(vector)
+
+            def remove_ids(self, selector):
+                del self.rows[selector.start:selector.stop]
+
+        class FakeVector:
+            def astype(self, dtype):
+                return self
+
+        fake_faiss = types.SimpleNamespace(
+            IDSelectorRange=lambda start, stop: types.SimpleNamespace(start=start, stop=stop),
+            serialize_index=lambda index: types.SimpleNamespace(
+                tobytes=lambda: str(index.ntotal).encode()
+            ),
+        )
+        monkeypatch.setitem(sys.modules, "faiss", fake_faiss)
+
+        cache = SemanticCache(persist_dir=str(tmp_path), max_entries=20, flush_interval=60)
+        cache._model = types.SimpleNamespace(encode=lambda *a, **k: FakeVector())
+        cache._index = FakeIndex()
+        cache._initialized = True
+
+        for i in range(21):
+            cache.store(f"prompt {i}", {"content": str(i)}, None, "explanation")
+
+        # Over capacity drops the oldest chunk (10% of max_entries, at least 1)
+        assert cache.stats()["size"] == 19
+        assert cache._index.ntotal == 19
+        assert cache._entries[0]["prompt"] == "prompt 2"
+        assert not (tmp_path / SemanticCache.ENTRIES_FILE).exists()
+
+        cache.close()
+
+        lines = (tmp_path / SemanticCache.ENTRIES_FILE).read_text().splitlines()
+        assert len(lines) == 19
+        assert (tmp_path / SemanticCache.INDEX_FILE).read_bytes() == b"19"
+
+
+class TestAsyncRouting:
+    """Test aroute_query."""
+
+    def test_gather_routes_each_task(self, router):
+        async def run():
+            return await asyncio.gather(
+                router.aroute_query("intent", "intent_classification"),
+                router.aroute_query("summary", "executive_summary"),
+            )
+
+        local, cloud = asyncio.run(run())
+
+        assert local["provider"] == "ollama"
+        assert local["cost"] == 0.0
+        assert cloud["provider"] == "claude"
+
+    def test_async_fallback(self, router):
+        router._ollama.fail = True
+
+        result = asyncio.run(router.aroute_query("intent", "intent_classification"))
+
+        assert result["provider"] == "claude"
+
+    def test_async_uses_cache(self, router):
+        asyncio.run(router.aroute_query("intent", "validation", temperature=0))
+        result = asyncio.run(router.aroute_query("intent", "validation", temperature=0))
+
+        assert router._ollama.calls == 1
+        assert result["cached"] is True
+
+
+class TestBatchRouting:
+    """Test bulk routing."""
+
+    def test_results_keep_request_order(self, router):
+        results = router.batch_route([
+            {"prompt": "a", "task_type": "intent_classification"},
+            {"prompt": "b", "task_type": "explanation"},
+            {"prompt": "c", "task_type": "validation"},
+        ])
+
+        assert [r["content"] for r in results] == ["ollama:a", "claude:b", "ollama:c"]
+
+    def test_cloud_requests_use_batch_api(self, router, monkeypatch):
+        from src.config import settings
+        from src.llm import router as router_module
+
+        submitted = []
+
+        class FakeBatchClient:
+            def __init__(self, claude):
+                pass
+
+            def run(self, requests):
+                submitted.extend(requests)
+                return {
+                    r["custom_id"]: {"content": "batched", "cost": 0.005, "provider": "claude"}
+                    for r in requests
+                }
+
+        monkeypatch.setattr(settings, "allow_batch_api", True)
+        monkeypatch.setattr(settings, "batch_api_min_size", 2)
+        monkeypatch.setattr(router_module, "ClaudeBatchClient", FakeBatchClient)
+
+        results = router.batch_route([
+            {"prompt": "a", "task_type": "explanation"},
+            {"prompt": "b", "task_type": "simple_sql"},
+            {"prompt": "c", "task_type": "rag_synthesis"},
+        ])
+
+        assert len(submitted) == 2
+        assert router._claude.calls == 0
+        assert [r["content"] for r in results] == ["batched", "ollama:b", "batched"]
+
+    def test_batch_cancelled_on_timeout(self):
+        import types
+        from src.llm.batch import ClaudeBatchClient
+
+        class FakeBatches:
+            def __init__(self):
+                self.cancelled = []
+
+            def create(self, requests):
+                return types.SimpleNamespace(id="batch_1")
+
+            def retrieve(self, batch_id):
+                return types.SimpleNamespace(processing_status="in_progress")
+
+            def cancel(self, batch_id):
+                self.cancelled.append(batch_id)
+
+        batches = FakeBatches()
+        claude = types.SimpleNamespace(
+            _client=types.SimpleNamespace(messages=types.SimpleNamespace(batches=batches)),
+            _build_request_params=lambda *args: {},
+        )
+        client = ClaudeBatchClient(claude, poll_interval=0.01, timeout=0.02)
+
+        with pytest.raises(TimeoutError):
+            client.run([{"custom_id": "0", "prompt": "a"}])
+
+        assert batches.cancelled == ["batch_1"]
+
+    def test_local_items_do_not_wait_for_batch(self, router, monkeypatch):
+        import threading
+        from src.config import settings
+        from src.llm import router as router_module
+
+        local_done = threading.Event()
+
+        class SlowBatchClient:
+            def __init__(self, claude):
+                pass
+
+            def run(self, requests):
+                # Only finishes once the local item has already been served
+                assert local_done.wait(timeout=2)
+                return {r["custom_id"]: {"content": "batched"} for r in requests}
+
+        original = router._ollama.generate_async
+
+        async def tracked(*args, **kwargs):
+            result = await original(*args, **kwargs)
+            local_done.set()
+            return result
+
+        monkeypatch.setattr(settings, "allow_batch_api", True)
+        monkeypatch.setattr(settings, "batch_api_min_size", 1)
+        monkeypatch.setattr(router_module, "ClaudeBatchClient", SlowBatchClient)
+        router._ollama.generate_async = tracked
+
+        results = router.batch_route([
+            {"prompt": "a", "task_type": "explanation"},
+            {"prompt": "b", "task_type": "simple_sql"},
+        ])
+
+        assert [r["content"] for r in results] == ["batched", "ollama:b"]
+
+    def test_repeated_sync_batches_share_one_loop(self, router):
+        loops = []
+        original = router._ollama.generate_async
+
+        async def tracked(*args, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            return await original(*args, **kwargs)
+
+        router._ollama.generate_async = tracked
+        try:
+            router.batch_route([{"prompt": "a", "task_type": "simple_sql"}])
+            router.batch_route([{"prompt": "b", "task_type": "simple_sql"}])
+        finally:
+            router.close()
+
+        assert len(loops) == 2
+        assert loops[0] is loops[1]
+        assert not loops[0].is_closed()
+
+
+class TestCircuitBreaker:
+    """Test provider circuit breakers."""
+
+    def test_open_circuit_skips_provider(self, router):
+        from src.llm.circuit import CircuitBreaker
+
+        router._ollama_cb = CircuitBreaker("ollama", failure_threshold=2, recovery_timeout=60)
+        router._ollama.fail = True
+
+        for _ in range(4):
+            result = router.route_query("intent", "intent_classification")
+            assert result["provider"] == "claude"
+
+        assert router._ollama.calls == 2
+        assert router.get_status()["ollama"]["circuit"]["state"] == "open"
+
+    def test_half_open_probe_closes_circuit(self, monkeypatch):
+        from src.llm import circuit
+
+        clock = [100.0]
+        monkeypatch.setattr(circuit.time, "monotonic", lambda: clock[0])
+
+        breaker = circuit.CircuitBreaker("claude", failure_threshold=1, recovery_timeout=30)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        clock[0] += 31
+        assert breaker.allow()
+        assert not breaker.allow()  # only one probe while half-open
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, monkeypatch):
+        from src.llm import circuit
+
+        clock = [0.0]
+        monkeypatch.setattr(circuit.time, "monotonic", lambda: clock[0])
+
+        breaker = circuit.CircuitBreaker("ollama", failure_threshold=3, recovery_timeout=10)
+        for _ in range(3):
+            breaker.record_failure()
+        clock[0] += 11
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    def test_stale_probe_expires(self, monkeypatch):
+        from src.llm import circuit
+
+        clock = [0.0]
+        monkeypatch.setattr(circuit.time, "monotonic", lambda: clock[0])
+
+        breaker = circuit.CircuitBreaker("claude", failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure()
+        clock[0] += 11
+        assert breaker.allow()  # probe that never reports back
+
+        clock[0] += 5
+        assert not breaker.allow()
+        clock[0] += 6
+        assert breaker.allow()
+
+    def _half_open_claude(self, router, monkeypatch):
+        import types
+        from src.llm import circuit
+
+        # Patch only the breaker's clock; asyncio needs the real one
+        clock = [0.0]
+        monkeypatch.setattr(circuit, "time", types.SimpleNamespace(monotonic=lambda: clock[0]))
+        router._claude_cb = circuit.CircuitBreaker(
+            "claude", failure_threshold=1, recovery_timeout=30
+        )
+        router._claude_cb.trip()
+        clock[0] += 31
+        return router._claude_cb
+
+    def test_cancelled_probe_is_released(self, router, monkeypatch):
+        breaker = self._half_open_claude(router, monkeypatch)
+        router._claude.delay = 1.0
+
+        async def cancel_in_flight():
+            task = asyncio.create_task(router.aroute_query("x", "explanation"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_in_flight())
+
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+
+    def test_abandoned_stream_releases_probe(self, router, monkeypatch):
+        breaker = self._half_open_claude(router, monkeypatch)
+
+        async def read_first_delta():
+            stream = router.astream_query("x", "explanation")
+            await stream.__anext__()
+            await stream.aclose()
+
+        asyncio.run(read_first_delta())
+
+        assert breaker.allow()
+
+
+class TestTimeouts:
+    """Test request timeouts and latency-based early fallback."""
+
+    def test_hard_timeout_trips_circuit(self, router, monkeypatch):
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "claude_request_timeout", 0.05)
+        router._claude.delay = 0.5
+
+        result = asyncio.run(router.aroute_query("summary", "executive_summary"))
+
+        assert result["provider"] == "ollama"
+        assert router.get_status()["claude"]["circuit"]["state"] == "open"
+
+    def test_slow_call_falls_back_early(self, router, monkeypatch):
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "hedge_min_samples", 5)
+        router._latencies["claude"].extend([0.01] * 5)
+        router._claude.delay = 0.5
+
+        result = asyncio.run(router.aroute_query("summary", "executive_summary"))
+
+        assert result["provider"] == "ollama"
+        status = router.get_status()["claude"]
+        assert status["circuit"]["state"] == "closed"
+        assert status["circuit"]["failure_count"] == 0
+        # The cut-off call still counts as a (slow) latency sample
+        assert status["latency"]["samples"] == 6
+        assert status["latency"]["max"] >= 0.03
+
+    def test_no_early_fallback_to_unavailable_ollama(self, router, monkeypatch):
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "hedge_min_samples", 5)
+        router._latencies["claude"].extend([0.01] * 20)
+        router._claude.delay = 0.2
+        router._ollama_available = False
+
+        result = asyncio.run(router.aroute_query("x", "explanation"))
+
+        assert result["provider"] == "claude"
+
+    def test_no_early_fallback_to_open_claude_circuit(self, router, monkeypatch):
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "hedge_min_samples", 5)
+        router._latencies["ollama"].extend([0.01] * 20)
+        router._ollama.delay = 0.2
+        router._claude_cb.trip()
+
+        result = asyncio.run(router.aroute_query("x", "simple_sql"))
+
+        assert result["provider"] == "ollama"
+
+    def test_repeated_hedge_cutoffs_keep_circuit_closed(self, router, monkeypatch):
+        from src.config import settings
+        from src.llm.circuit import CircuitBreaker
+
+        monkeypatch.setattr(settings, "hedge_min_samples", 5)
+        router._claude_cb = CircuitBreaker("claude", failure_threshold=2, recovery_timeout=60)
+        router._latencies["claude"].extend([0.01] * 20)
+        router._claude.delay = 0.2
+
+        for _ in range(5):
+            result = asyncio.run(router.aroute_query("summary", "executive_summary"))
+            assert result["provider"] == "ollama"
+
+        assert router.get_status()["claude"]["circuit"]["state"] == "closed"
+
+
+COMPLEXITY_CASES = [
+    ("Show me total revenue", "low", 0, 1),
+    ("Show customers", "low", 0, 0),
+    ("Compare revenue trend across regions", "high", 3, 0),
+    ("Top 10 products by sales count, total and sum", "medium", 0, 4),
+    ("Join orders and compare the total count", "high", 2, 2),
+    ("Summary of account stops", "medium", 0, 3),  # substring semantics
+    ("Total sales order by region, total again", "medium", 0, 3),  # overlap
+    ("Revenue by month, then by month again", "low", 0, 1),  # repeated phrase
+    ("Sales grouped by region", "low", 0, 1),  # "group by" needs adjacency
+]
+
+
+class TestQueryComplexity:
+    """Test analyze_query_complexity."""
+
+    @pytest.mark.parametrize("query,complexity,complex_count,medium_count", COMPLEXITY_CASES)
+    def test_indicator_counts(self, router, query, complexity, complex_count, medium_count):
+        result = router.analyze_query_complexity(query)
+
+        assert result["complexity"] == complexity
+        assert result["complex_indicators_found"] == complex_count
+        assert result["medium_indicators_found"] == medium_count
+
+    @pytest.mark.parametrize("query,complexity,complex_count,medium_count", COMPLEXITY_CASES)
+    def test_fallback_matches(self, router, monkeypatch, query, complexity,
+                              complex_count, medium_count):
+        from src.llm import router as router_module
+
+        monkeypatch.setattr(router_module, "_INDICATOR_AUTOMATON", None)
+        result = router.analyze_query_complexity(query)
+
+        assert result["complex_indicators_found"] == complex_count
+        assert result["medium_indicators_found"] == medium_count
+
+    def test_fallback_phrase_spans_punctuation(self, router, monkeypatch):
+        from src.llm import router as router_module
+
+        monkeypatch.setattr(router_module, "_INDICATOR_AUTOMATON", None)
+        result = router.analyze_query_complexity("Revenue, ordered by: region")
+
+        # Token pairs ignore separators ("by: region" -> "by region")
+        assert result["medium_indicators_found"] == 1
+
+
+class TestCostEstimate:
+    """Test estimate_cost."""
+
+    def test_claude_estimate(self, router):
+        estimate = router.estimate_cost("explanation", 1000)
+
+        assert estimate["claude"] == pytest.approx(0.0102)
+        assert estimate["ollama"] == 0.0
+        assert estimate["recommended"] == "claude"
+
+    def test_unknown_task_type_defaults_to_local(self, router):
+        estimate = router.estimate_cost("not_a_task", 1000)
+
+        assert estimate["task_type"] == "simple_sql"
+        assert estimate["recommended"] == "ollama"
+
+
+class TestClaudePromptCaching:
+    """Test prompt-cache request shaping and cost accounting."""
+
+    @pytest.fixture
+    def claude(self, monkeypatch):
+        from src.config import settings
+        from src.llm.claude_service import ClaudeService
+
+        monkeypatch.setattr(settings, "anthropic_api_key", None)
+        return ClaudeService(model="claude-sonnet-4-20250514")
+
+    def test_system_prompt_is_cache_breakpoint(self, claude):
+        params = claude._build_request_params("q", "schema", 100, 0.1)
+
+        assert params["system"] == [{
+            "type": "text",
+            "text": "schema",
+            "cache_control": {"type": "ephemeral"},
+        }]
+
+    def test_cache_reads_are_discounted(self, claude):
+        from types import SimpleNamespace
+
+        response = SimpleNamespace(
+            content=[SimpleNamespace(text="SELECT 1;")],
+            model="claude-sonnet-4-20250514",
+            stop_reason="end_turn",
+            usage=SimpleNamespace(
+                input_tokens=100,
+                output_tokens=100,
+                cache_read_input_tokens=1000,
+                cache_creation_input_tokens=0,
+            ),
+        )
+
+        result = claude._build_result(response)
+
+        assert result["cache_read_input_tokens"] == 1000
+        assert result["tokens"] == 1200
+        # 100 input + 1000 cached at 10% + 100 output
+        assert result["cost"] == pytest.approx(100 * 3e-6 + 1000 * 3e-7 + 100 * 15e-6)
+
+
+class TestOllamaHealth:
+    """Test cached Ollama availability."""
+
+    def test_unavailable_flag_skips_ollama(self, router):
+        router._ollama_available = False
+
+        result = router.route_query("intent", "intent_classification")
+
+        assert result["provider"] == "claude"
+        assert router._ollama.calls == 0
+        assert router.get_status()["ollama"]["available"] is False
+
+    def test_background_probe_updates_flag(self, monkeypatch):
+        import time
+        from src.config import settings
+        from src.llm import router as router_module
+
+        class FakeOllama(FakeService):
+            def __init__(self):
+                super().__init__("ollama")
+                self.up = True
+
+            def is_available(self):
+                return self.up
+
+        fake = FakeOllama()
+        monkeypatch.setattr(settings, "use_local_llm", True)
+        monkeypatch.setattr(settings, "anthropic_api_key", None)
+        monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+        monkeypatch.setattr(settings, "health_probe_interval", 0.01)
+        monkeypatch.setattr(router_module, "OllamaService", lambda: fake)
+
+        router = router_module.LLMRouter()
+        try:
+            assert router._ollama_available is True
+            fake.up = False
+            deadline = time.monotonic() + 2
+            while router._ollama_available and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert router._ollama_available is False
+        finally:
+            router.close()
+
+
+class TestSpeculativeRouting:
+    """Test racing Claude against Ollama."""
+
+    def test_faster_provider_wins(self, router):
+        router._claude.delay = 0.5
+
+        result = asyncio.run(
+            router.aroute_query("Explain revenue", "explanation", speculative=True)
+        )
+
+        waste = router.get_status()["speculative_waste"]
+        assert result["provider"] == "ollama"
+        assert waste["races"] == 1
+        assert waste["wins"]["ollama"] == 1
+        assert waste["wasted_tokens"] > 0  # cancelled Claude prompt
+
+    def test_raced_answer_is_not_cached(self, router):
+        router._semcache = FakeSemanticCache()
+        router._claude.delay = 0.5
+
+        raced = asyncio.run(
+            router.aroute_query(
+                "Explain revenue", "explanation", temperature=0, speculative=True
+            )
+        )
+        assert raced["provider"] == "ollama"
+
+        result = router.route_query("explain revenue", "explanation", temperature=0)
+
+        assert result["provider"] == "claude"
+        assert router._claude.calls == 1
+        assert "cached" not in result
+
+    def test_unacceptable_answer_waits_for_other(self, router):
+        async def empty(*args, **kwargs):
+            return {"content": "  ", "tokens": 3, "provider": "ollama"}
+
+        router._ollama.generate_async = empty
+        router._claude.delay = 0.05
+
+        result = asyncio.run(
+            router.aroute_query("Summarize Q3", "executive_summary", speculative=True)
+        )
+
+        assert result["provider"] == "claude"
+        assert router.get_status()["speculative_waste"]["wasted_tokens"] == 3
+
+    def test_sql_is_never_raced(self, router):
+        asyncio.run(router.aroute_query("Join sales", "complex_sql", speculative=True))
+
+        assert router._ollama.calls == 0
+        assert router.get_status()["speculative_waste"]["races"] == 0
+
+
+class TestStreaming:
+    """Test token streaming through the router."""
+
+    def test_deltas_then_result(self, router):
+        deltas, result = collect_stream(router, "revenue", "simple_sql")
+
+        assert deltas == ["ollama", "revenue"]
+        assert result["provider"] == "ollama"
+        assert result["cost"] == 0.0
+
+    def test_falls_back_before_first_token(self, router):
+        router._claude.fail = True
+
+        deltas, result = collect_stream(router, "summarize", "executive_summary")
+
+        assert result["provider"] == "ollama"
+        assert deltas == ["ollama", "summarize"]
+        assert router.get_status()["claude"]["circuit"]["failure_count"] == 1
+
+    def test_cached_response_is_replayed(self, router):
+        collect_stream(router, "revenue", "simple_sql", temperature=0)
+        deltas, result = collect_stream(router, "revenue", "simple_sql", temperature=0)
+
+        assert router._ollama.calls == 1
+        assert deltas == ["ollama:revenue"]
+        assert result["cached"] is True
+
+
+class TestLazyInitialization:
+    """Test singleton safety and on-demand Claude construction."""
+
+    @pytest.fixture
+    def lazy_router(self, monkeypatch):
+        from src.config import settings
+        from src.llm import router as router_module
+
+        created = []
+
+        def fake_claude():
+            created.append(FakeService("claude"))
+            return created[-1]
+
+        monkeypatch.setattr(settings, "use_local_llm", False)
+        monkeypatch.setattr(settings, "anthropic_api_key", "sk-test")
+        monkeypatch.setattr(settings, "claude_use_bedrock", False)
+        monkeypatch.setattr(settings, "redis_url", None)
+        monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+        monkeypatch.setattr(router_module, "ClaudeService", fake_claude)
+
+        router = router_module.LLMRouter()
+        return router, created
+
+    def test_claude_built_on_first_cloud_request(self, lazy_router):
+        router, created = lazy_router
+
+        status = router.get_status()["claude"]
+        assert status["available"] is True
+        assert status["initialized"] is False
+        assert status["latency_mode"] == "standard"
+        assert created == []
+
+        router.route_query("summarize", "executive_summary")
+        router.route_query("summarize again", "executive_summary")
+
+        assert len(created) == 1
+        assert router.get_status()["claude"]["initialized"] is True
+
+    def test_latency_mode_reported_before_init(self, lazy_router, monkeypatch):
+        from src.config import settings
+
+        router, created = lazy_router
+        monkeypatch.setattr(settings, "claude_use_bedrock", True)
+        monkeypatch.setattr(settings, "claude_latency_optimized", True)
+
+        assert router.get_status()["claude"]["latency_mode"] == "optimized"
+        assert created == []
+
+    def test_concurrent_first_use_builds_once(self, lazy_router):
+        from concurrent.futures import ThreadPoolExecutor
+
+        router, created = lazy_router
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: router._claude, range(32)))
+
+        assert len(created) == 1
+
+    def test_singleton_is_created_once(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from src.llm import router as router_module
+
+        monkeypatch.setattr(router_module, "_router_instance", None)
+        monkeypatch.setattr(router_module, "LLMRouter", lambda: object())
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            routers = list(pool.map(lambda _: router_module.get_llm_router(), range(32)))
+
+        assert all(r is routers[0] for r in routers)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])